@@ -1,26 +1,64 @@
+import json
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from itertools import permutations, product
-from random import choice, sample
+from math import perm
+from multiprocessing.shared_memory import SharedMemory
+from random import choice, randrange, sample, shuffle
+from sys import argv
+from time import perf_counter
 from typing import Generator, Iterable
 
+import numpy as np
+
+from Feedback import (
+    TABLE_SIZE_LIMIT,
+    decodeCode,
+    encodeCode,
+    encodeCodes,
+    getCodeUniverse,
+    getFeedbackTable,
+    getNumberOfCodes,
+    getResponse,
+    getResponses,
+)
+
+# the directory the generated opening book and decision tree files are stored in
+DATA_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
 
 class Algorithm(ABC):
     """
-    Abstract class for algorithms
+    Abstract class for algorithms.
+    Guesses and responses are passed around encoded as integers, see Feedback.py
     """
 
     def __init__(self, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool):
         self._lengthOfCode = lengthOfCode
+        self._colourNum = colourNum
         self._colourOptions = [i for i in range(1, colourNum + 1)]
         self._duplicatesAllowed = duplicatesAllowed
+        # the number of times a guess has been scored against a set of codes
+        self._scoringCalls = 0
 
     @abstractmethod
-    def getNextGuess(self, previousResponse: list[int] = None) -> list:
+    def getNextGuess(self, previousResponse: int = None) -> int:
         """
-        Gets the next guess according to the algorithm
+        Gets the next encoded guess according to the algorithm
         """
         raise NotImplementedError()
 
+    def getScoringCalls(self) -> int:
+        return self._scoringCalls
+
+    def getConsistentSetSize(self) -> int | None:
+        """
+        Returns the number of codes that are consistent with the responses so far,
+        or None if the algorithm does not keep track of them.
+        """
+        return None
+
 
 class Random(Algorithm):
     """
@@ -30,62 +68,107 @@ class Random(Algorithm):
     def __init__(self, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool):
         super().__init__(lengthOfCode, colourNum, duplicatesAllowed)
 
-    def getNextGuess(self, previousResponse: list[int] = None) -> list:
+    def getNextGuess(self, previousResponse: int = None) -> int:
         """
-        Gets the next guess according to the algorithm
+        Gets the next encoded guess according to the algorithm
         """
         if self._duplicatesAllowed:
-            return [choice(self._colourOptions) for _ in range(self._lengthOfCode)]
-        return sample(self._colourOptions, self._lengthOfCode)
+            guess = [choice(self._colourOptions) for _ in range(self._lengthOfCode)]
+        else:
+            guess = sample(self._colourOptions, self._lengthOfCode)
+        return encodeCode(guess, self._colourNum)
 
 
 class RandomConsistent(Algorithm):
     """
-    Random algorithm that is consistent with the feedback it is given
+    Random algorithm that is consistent with the feedback it is given.
+    If there are more than ENUMERATION_LIMIT possible codes, the set of possible guesses is not created.
+    Instead, consistent guesses are searched for lazily using the previous guesses and responses.
+    If timeBudget is given, the search for each guess takes at most about that many seconds,
+    otherwise it takes at most SEARCH_TIME seconds.
     """
 
     ##################################################
     # GROUP A SKILL: COMPLEX USER DEFINED ALGORITHMS #
     ##################################################
 
-    def __init__(self, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool):
+    ENUMERATION_LIMIT = 2**20
+    # the number of steps the search for a consistent guess takes before it first restarts
+    SEARCH_BUDGET = 2**8
+    # the largest number of steps the search takes before it restarts, so it can check the time
+    SEARCH_LIMIT = 2**11
+    # the default time in seconds the search has to find a consistent guess before it relaxes the previous guesses
+    SEARCH_TIME = 10.0
+
+    def __init__(
+        self,
+        lengthOfCode: int,
+        colourNum: int,
+        duplicatesAllowed: bool,
+        timeBudget: float | None = None,
+    ):
         super().__init__(lengthOfCode, colourNum, duplicatesAllowed)
         self._previousGuess = None
+        self._timeBudget = timeBudget
+        # the number of guesses that were not consistent with every previous guess and response
+        self._inconsistentGuesses = 0
+        self._lazy = (
+            getNumberOfCodes(lengthOfCode, colourNum, duplicatesAllowed)
+            > self.ENUMERATION_LIMIT
+        )
+        if self._lazy:
+            # a list of the previous guesses and responses, used to prune the search
+            self._history = []
+            return
+        # get the precomputed table of responses, if the board is small enough to have one
+        self._table = getFeedbackTable(lengthOfCode, colourNum, duplicatesAllowed)
+        # get the shared array of all possible codes in lexicographic order, both encoded and as a 2D array
+        # along with how many times each colour appears in each code
+        universe = getCodeUniverse(lengthOfCode, colourNum, duplicatesAllowed)
+        self._codes = universe.getCodes()
+        self._codeArray = universe.getCodeArray()
+        self._colourCounts = universe.getColourCounts()
         # create a set S of all possible guesses
-        if self._duplicatesAllowed:
-            self._S = set(product(self._colourOptions, repeat=lengthOfCode))
-        else:
-            self._S = set(permutations(self._colourOptions, r=lengthOfCode))
+        # stored as a mask over the codes, where S[i] is True if code i is in S
+        self._S = np.ones(len(self._codes), dtype=bool)
+        # a buffer the indices of the codes in S are kept at the start of
+        # the survivors are compacted into it after each response, so it is never reallocated
+        self.__SBuffer = np.arange(len(self._codes))
+        # a view of the indices of the codes in S in the buffer
+        # if S is changed directly, this is set to None and recalculated when needed
+        self._SIndices = self.__SBuffer[:]
 
-    def getNextGuess(self, previousResponse: list[int] = None) -> list[int]:
+    def getNextGuess(self, previousResponse: int = None) -> int:
         """
-        Gets the next guess according to the algorithm.
+        Gets the next encoded guess according to the algorithm.
         """
         if self._previousGuess is None:
             self._previousGuess = self._genInitialGuess()
             return self._previousGuess
-        elif len(self._S) == 1:
-            for e in self._S:
-                break
-            return list(e)
-        elif len(self._S) == 0:
+        elif self._lazy:
+            if previousResponse is None:
+                raise ValueError("previousResponse cannot be None")
+            self._addToHistory(self._previousGuess, previousResponse)
+            self._previousGuess = self._genConsistentGuess()
+            return self._previousGuess
+        elif self._getSizeOfS() == 1:
+            return int(self._codes[np.argmax(self._S)])
+        elif self._getSizeOfS() == 0:
             raise ValueError("No possible guesses")
         elif previousResponse is None:
             raise ValueError("previousResponse cannot be None")
         else:
             # remove from S all guesses that would not give the same response if the current guess was the code
-            self._S.difference_update(
-                self._getGuessesThatWouldNotGiveSameResponse(
-                    self._previousGuess, previousResponse
-                )
+            self._removeGuessesThatWouldNotGiveSameResponse(
+                self._getIndex(self._previousGuess), previousResponse
             )
             # call _genNextGuess to get the next guess
             self._previousGuess = self._genNextGuess()
             return self._previousGuess
 
-    def _genInitialGuess(self) -> list[int]:
+    def _genInitialGuess(self) -> int:
         """
-        Calculates the initial guess
+        Calculates the encoded initial guess
         """
         if self._duplicatesAllowed:
             x = [i for i in self._colourOptions for _ in range(2)]
@@ -95,7 +178,7 @@ class RandomConsistent(Algorithm):
         guess = []
         for _ in range(self._lengthOfCode):
             guess.append(next(y))
-        return guess
+        return encodeCode(guess, self._colourNum)
 
     def _cycle(self, iterable: Iterable) -> Generator:
         """
@@ -109,49 +192,277 @@ class RandomConsistent(Algorithm):
             for element in saved:
                 yield element
 
-    def _genNextGuess(self) -> list[int]:
+    def _genNextGuess(self) -> int:
+        """
+        Returns a random encoded guess from the remaining guesses
+        """
+        return int(self._codes[self._getIndicesOfS()[randrange(self._getSizeOfS())]])
+
+    def _addToHistory(self, guess: int, response: int):
+        """
+        Saves a guess and its encoded response.
+        The colour counts of the guess, the number of 1s, the total number of 1s and 2s,
+        and the colour counts of the guess after each position
+        are saved so that they do not need to be recalculated during the search.
+        """
+        lguess = decodeCode(guess, self._lengthOfCode, self._colourNum)
+        guessCounts = [0 for _ in range(self._colourNum + 1)]
+        # work backwards through the guess to count the colours after each position
+        countsAfter = [[] for _ in lguess]
+        for position in range(self._lengthOfCode - 1, -1, -1):
+            countsAfter[position] = [
+                (colour, count) for colour, count in enumerate(guessCounts) if count
+            ]
+            guessCounts[lguess[position]] += 1
+        black, white = divmod(response, self._lengthOfCode + 1)
+        self._history.append((lguess, guessCounts, black, black + white, countsAfter))
+
+    def _genConsistentGuess(self) -> int:
+        """
+        Returns a random encoded guess that is consistent with all of the previous guesses and responses.
+        The search can get stuck exploring choices that lead nowhere,
+        so it is restarted with new random choices and a larger budget, up to SEARCH_LIMIT, if it takes too long.
+        If no guess is found before the time runs out, the oldest previous guess is no longer
+        required to be consistent, one at a time, so that the computer does not take too long to make a guess.
+        Such a guess is counted by getInconsistentGuesses.
+        """
+        history = self._history
+        budget = self.SEARCH_BUDGET
+        timeBudget = self.SEARCH_TIME if self._timeBudget is None else self._timeBudget
+        deadline = perf_counter() + timeBudget
+        while True:
+            self._searchBudget = budget
+            for code in self._genConsistentCodes(history):
+                if len(history) < len(self._history):
+                    self._inconsistentGuesses += 1
+                return encodeCode(code, self._colourNum)
+            if self._searchBudget >= 0:
+                # the search finished without running out of budget, so there are no consistent codes
+                if len(history) == len(self._history):
+                    raise ValueError("No possible guesses")
+                history = history[1:]
+            elif perf_counter() >= deadline:
+                # each search after the deadline is short, so relaxing takes little extra time
+                history = history[1:]
+                budget = self.SEARCH_BUDGET
+            elif budget < self.SEARCH_LIMIT:
+                budget *= 2
+
+    def getInconsistentGuesses(self) -> int:
+        """
+        Returns the number of guesses that were not consistent with every previous guess and response,
+        because the search ran out of time.
+        """
+        return self._inconsistentGuesses
+
+    def _genConsistentCodes(self, history: list[tuple]) -> Generator:
+        """
+        Lazily generates codes that are consistent with the previous guesses and responses in history.
+        The total number of 1s and 2s a code gives only depends on how many of each colour it has,
+        so first how many of each colour the code has is chosen so that the totals are correct,
+        then those colours are arranged so that the number of 1s is correct.
+        """
+        # choose the number of each colour in a random order of colours
+        colours = self._colourOptions.copy()
+        shuffle(colours)
+        # for each previous guess, how many pegs it has of each colour from colours[i] onwards
+        countsFrom = []
+        for _, guessCounts, _, _, _ in history:
+            counts = [0 for _ in range(len(colours) + 1)]
+            for i in range(len(colours) - 1, -1, -1):
+                counts[i] = counts[i + 1] + guessCounts[colours[i]]
+            countsFrom.append(counts)
+        emptyCounts = [0 for _ in range(self._colourNum + 1)]
+        for colourCounts in self._genConsistentColourCounts(
+            history, colours, countsFrom, emptyCounts, [0 for _ in history], 0
+        ):
+            yield from self._genConsistentArrangements(
+                history, [], colourCounts, [0 for _ in history]
+            )
+
+    def _genConsistentColourCounts(
+        self,
+        history: list[tuple],
+        colours: list[int],
+        countsFrom: list[list[int]],
+        colourCounts: list[int],
+        totals: list[int],
+        i: int,
+    ) -> Generator:
+        """
+        Lazily generates how many of each colour a consistent code could have.
+        colourCounts has been chosen for the first i colours in colours,
+        and totals is the total number of 1s and 2s they give against each previous guess.
+        A choice is abandoned as soon as it gives too high a total,
+        or the remaining colours cannot make up the total.
+        """
+        ##################################################
+        # GROUP A SKILL: COMPLEX USER DEFINED ALGORITHMS #
+        # GROUP A SKILL: RECURSIVE ALGORITHMS            #
+        ##################################################
+        self._searchBudget -= 1
+        if self._searchBudget < 0:
+            return
+        remainingPositions = self._lengthOfCode - sum(colourCounts)
+        # basis case
+        if i == len(colours):
+            if remainingPositions == 0:
+                yield colourCounts
+            return
+        colour = colours[i]
+        if i == len(colours) - 1:
+            # the last colour fills the remaining positions
+            options = [remainingPositions]
+        elif self._duplicatesAllowed:
+            # try the counts closest to an even share of the remaining positions first
+            options = [n for n in range(remainingPositions + 1)]
+            shuffle(options)
+            share = remainingPositions / (len(colours) - i)
+            options.sort(key=lambda n: abs(n - share))
+        else:
+            options = [0, 1] if remainingPositions > 0 else [0]
+            shuffle(options)
+        for n in options:
+            if not self._duplicatesAllowed and n > 1:
+                continue
+            left = remainingPositions - n
+            newTotals = []
+            for j, (_, guessCounts, _, total, _) in enumerate(history):
+                newTotal = totals[j] + min(n, guessCounts[colour])
+                # the most that the rest of the colours could add to the total
+                possible = min(left, countsFrom[j][i + 1])
+                if newTotal > total or newTotal + possible < total:
+                    break
+                newTotals.append(newTotal)
+            else:
+                colourCounts[colour] = n
+                yield from self._genConsistentColourCounts(
+                    history, colours, countsFrom, colourCounts, newTotals, i + 1
+                )
+                colourCounts[colour] = 0
+
+    def _genConsistentArrangements(
+        self,
+        history: list[tuple],
+        code: list[int],
+        colourCounts: list[int],
+        blacks: list[int],
+    ) -> Generator:
+        """
+        Lazily generates arrangements of the remaining colours in colourCounts after the partial code,
+        that give the right number of 1s against each previous guess.
+        blacks is the number of 1s the partial code already gives against each previous guess.
+        A partial code is abandoned as soon as it gives too many 1s,
+        or the remaining positions cannot give enough 1s.
+        """
+        ##################################################
+        # GROUP A SKILL: COMPLEX USER DEFINED ALGORITHMS #
+        # GROUP A SKILL: RECURSIVE ALGORITHMS            #
+        ##################################################
+        self._searchBudget -= 1
+        if self._searchBudget < 0:
+            return
+        position = len(code)
+        # basis case
+        if position == self._lengthOfCode:
+            yield code.copy()
+            return
+        colours = [c for c in self._colourOptions if colourCounts[c] > 0]
+        shuffle(colours)
+        for colour in colours:
+            colourCounts[colour] -= 1
+            newBlacks = []
+            for j, (guess, _, black, _, countsAfter) in enumerate(history):
+                newBlack = blacks[j] + (guess[position] == colour)
+                # the most 1s the remaining positions could give
+                possible = sum(
+                    min(colourCounts[c], count) for c, count in countsAfter[position]
+                )
+                if newBlack > black or newBlack + possible < black:
+                    break
+                newBlacks.append(newBlack)
+            else:
+                code.append(colour)
+                yield from self._genConsistentArrangements(
+                    history, code, colourCounts, newBlacks
+                )
+                code.pop()
+            colourCounts[colour] += 1
+
+    def getConsistentSetSize(self) -> int | None:
+        """
+        Returns the size of S, or None if the board is too large for S to be created.
+        """
+        if self._lazy:
+            return None
+        return self._getSizeOfS()
+
+    def _getIndicesOfS(self) -> np.ndarray:
+        """
+        Returns an array of the indices of the codes in S
+        """
+        if self._SIndices is None:
+            size = np.count_nonzero(self._S)
+            self.__SBuffer[:size] = np.flatnonzero(self._S)
+            self._SIndices = self.__SBuffer[:size]
+        return self._SIndices
+
+    def _getSizeOfS(self) -> int:
+        """
+        Returns the number of guesses in S
+        """
+        return len(self._getIndicesOfS())
+
+    def _getIndex(self, code: int) -> int:
+        """
+        Returns the index of the encoded code in the array of all possible codes.
+        The codes are in order so it can be found with a binary search.
+        """
+        return int(np.searchsorted(self._codes, code))
+
+    def _getResponsesFromS(self, guess: int) -> np.ndarray:
+        """
+        Returns an array of the encoded responses of the guess against every code in S
+        """
+        self._scoringCalls += 1
+        S = self._getIndicesOfS()
+        if self._table is not None:
+            return self._table.getResponses(guess)[S]
+        black, white = self._getResponses(
+            self._codeArray[guess], self._codeArray[S], self._colourCounts[S]
+        )
+        return black * (self._lengthOfCode + 1) + white
+
+    def _removeGuessesThatWouldNotGiveSameResponse(
+        self, guess: int, previousResponse: int
+    ):
         """
-        Returns a random guess from the remaining guesses
+        Removes from S all guesses that would not give the same response as the previous guess.
+        Only the codes in S are scored, and the survivors are compacted to the start of the buffer,
+        so the work done is proportional to the size of S rather than the number of possible codes.
         """
-        return list(choice(list(self._S)))
+        S = self._getIndicesOfS()
+        sameResponse = self._getResponsesFromS(guess) == previousResponse
+        self._S[S[~sameResponse]] = False
+        size = np.count_nonzero(sameResponse)
+        self.__SBuffer[:size] = S[sameResponse]
+        self._SIndices = self.__SBuffer[:size]
 
-    def _getGuessesThatWouldNotGiveSameResponse(
-        self, guess: list[int], previousResponse: list[int]
-    ) -> set[tuple[int]]:
+    def _getResponses(
+        self, guess: list[int], codes: np.ndarray, codeCounts: np.ndarray = None
+    ) -> tuple[np.ndarray, np.ndarray]:
         """
-        Returns a set of all guesses that would not give the same response as the previous guess
+        Returns a tuple of an array of the number of 1s and an array of the number of 2s
+        in the result of the guess against each row of a 2D array of codes.
+        This is the vectorised equivalent of _getResponse.
         """
-        guessesThatWouldNotGiveSameResponse = set()
-        for code in self._S:
-            # turn the code tuple into a list
-            lcode = list(code)
-            response = self._getResponse(guess, lcode)
-            if response != previousResponse:
-                guessesThatWouldNotGiveSameResponse.add(code)
-        return guessesThatWouldNotGiveSameResponse
+        return getResponses(guess, codes, codeCounts)
 
     def _getResponse(self, guess: list[int], code: list[int]) -> list:
         """
         Returns a list of the result of the guess against the code
         """
-        ##################################
-        # GROUP A SKILL: LIST OPERATIONS #
-        ##################################
-        result = []
-        tempCode = code.copy()
-        tempGuess = guess.copy()
-        for i in range(len(guess)):
-            if code[i] == guess[i]:
-                result.append(1)
-                tempCode[i] = None
-                tempGuess[i] = None
-        tempGuess = [x for x in tempGuess if x is not None]
-        tempCode = [x for x in tempCode if x is not None]
-        for i in range(len(tempGuess)):
-            if tempGuess[i] in tempCode:
-                result.append(2)
-                tempCode.pop(tempCode.index(tempGuess[i]))
-        return result
+        return getResponse(guess, code)
 
 
 class Knuths(RandomConsistent):
@@ -166,6 +477,14 @@ class Knuths(RandomConsistent):
         5. otherwise remove from S all guesses that would not give the same response if the current guess was the code
         6. calculate the next guess using minimax -> choose the guess that has the least worse response score
         7. repeat from step 3
+    If workers is more than 1, the guesses in C are scored in parallel by that many processes.
+    The guesses for the first OPENING_BOOK_DEPTH moves only depend on the previous responses,
+    so they are stored in an opening book on disk the first time they are calculated.
+    If timeBudget is given, each guess stops being calculated after that many seconds,
+    and the best guess scored so far is returned. The guesses in S are scored first, as they
+    are the most likely to be good. timeBudget takes priority over workers.
+    Guesses that are the same under a permutation of the colours and positions that leaves every
+    previous guess unchanged have the same score, so only one guess from each class is scored.
     """
 
     ##################################################
@@ -173,91 +492,670 @@ class Knuths(RandomConsistent):
     # GROUP A SKILL: COMPLEX USER DEFINED OOP MODEL  #
     ##################################################
 
-    def __init__(self, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool):
-        super().__init__(lengthOfCode, colourNum, duplicatesAllowed)
+    # minimax scores every possible code against S, so it becomes too slow on much smaller boards
+    ENUMERATION_LIMIT = 2**16
+    # the file the opening book is stored in, or None to not use an opening book
+    OPENING_BOOK = "openingBook.json"
+    # the number of moves that are stored in the opening book
+    OPENING_BOOK_DEPTH = 2
+    # the version of the opening book file, which is changed whenever the guesses calculated change
+    # so that guesses stored by an older version are not used
+    OPENING_BOOK_VERSION = 1
+    # the opening books that have already been loaded, keyed by algorithm and board configuration
+    # they are shared by every instance, so the file is only read once for each board
+    __openingBooks: dict[tuple[str, int, int, bool], dict[str, int]] = {}
+    # the number of guesses scored between each check of the time budget
+    TIME_BUDGET_CHUNK = 4
+    # the largest number of position permutations that are checked when finding symmetric guesses
+    SYMMETRY_LIMIT = 720
+
+    def __init__(
+        self,
+        lengthOfCode: int,
+        colourNum: int,
+        duplicatesAllowed: bool,
+        workers: int = 1,
+        useOpeningBook: bool = True,
+        timeBudget: float | None = None,
+    ):
+        super().__init__(lengthOfCode, colourNum, duplicatesAllowed, timeBudget)
         # set S from the superclass
         # create a set C of all possible codes
-        self.__C = frozenset(self._S)
+        # if the board is too large to create the set, the superclass searches for consistent guesses instead
+        self.__C = None if self._lazy else range(len(self._codes))
+        self.__workers = workers
+        # the pool of worker processes and the shared memory used to send them S
+        # these are created the first time they are needed
+        self.__pool = None
+        self.__sharedS = None
+        # the guesses and responses so far, the responses are used to look up guesses in the opening book
+        # and the guesses are used to find the guesses that are symmetric to each other
+        self._previousGuesses = []
+        self.__responses = []
+        self.__openingBook = self.__loadOpeningBook() if useOpeningBook else None
+        # the time the current guess must be calculated by, if there is a time budget
+        self.__deadline = None
+
+    def getNextGuess(self, previousResponse: int = None) -> int:
+        """
+        Gets the next encoded guess according to the algorithm.
+        """
+        if self._previousGuess is not None:
+            self._previousGuesses.append(self._previousGuess)
+            self.__responses.append(previousResponse)
+        if self._timeBudget is not None:
+            self.__deadline = perf_counter() + self._timeBudget
+        return super().getNextGuess(previousResponse)
 
-    def _genNextGuess(self) -> list[int]:
+    def _genNextGuess(self) -> int:
         """
-        Calculates the next guess using minimax.
+        Calculates the next encoded guess using minimax.
         Chooses the guess that has the best worst case scenario.
+        Guesses early in the game are looked up in the opening book if they have been calculated before.
+        """
+        key = ",".join(str(response) for response in self.__responses)
+        if self.__openingBook is not None and key in self.__openingBook:
+            return self.__openingBook[key]
+        guess, complete = self.__calcNextGuess()
+        if (
+            self.__openingBook is not None
+            and complete
+            and len(self.__responses) < self.OPENING_BOOK_DEPTH
+        ):
+            self.__openingBook[key] = guess
+            self.__saveOpeningBook()
+        return guess
+
+    def __calcNextGuess(self) -> tuple[int, bool]:
+        """
+        Scores the guesses in C and returns a tuple of the best one and if every guess was scored.
+        If the time budget runs out before any guess is scored, a random guess from S is returned.
         """
-        bestScore = -1
+        complete = True
+        guessClasses = self.__getGuessClasses()
+        if guessClasses is None:
+            candidates = self.__C
+        else:
+            # the first guess in each class is scored
+            candidates = np.unique(guessClasses, return_index=True)[1].tolist()
+        if self.__deadline is not None:
+            _, guesses, complete = self.__scoreGuessesUntilDeadline(candidates)
+            if not guesses:
+                return super()._genNextGuess(), False
+        elif self.__workers > 1:
+            _, guesses = self.__scoreGuessesInParallel(candidates)
+        else:
+            _, guesses = self._scoreGuesses(candidates)
+        if guessClasses is not None:
+            # every guess in the same class as a best guess has the same score
+            guesses = np.flatnonzero(np.isin(guessClasses, guessClasses[guesses]))
+            guesses = guesses.tolist()
+        # the codes are in lexicographic order, so the smallest index is the smallest code
+        # choose the smallest guess in S if there is one, otherwise the smallest guess
+        guesses = np.asarray(guesses)
+        guessesInS = guesses[self._S[guesses]]
+        if len(guessesInS) > 0:
+            return int(self._codes[guessesInS.min()]), complete
+        return int(self._codes[guesses.min()]), complete
+
+    def _scoreGuesses(self, guesses: Iterable[int]) -> tuple[int | float, list[int]]:
+        """
+        Scores each of the guesses.
+        Returns a tuple of the best score and a list of the guesses that have the best score.
+        """
+        bestScore = float("-inf")
         possibleGuesses = set()
-        for guess in self.__C:
-            score = self.__calcScore(list(guess))
+        for guess in guesses:
+            score = self.__calcScore(guess)
             if score[1] > bestScore:
                 bestScore = score[1]
                 possibleGuesses = {score}
             elif score[1] == bestScore:
                 possibleGuesses.add(score)
-        guesses = []
+        bestGuesses = []
         for guess, _ in possibleGuesses:
-            guesses.append(guess)
-        guesses = self._mergeSort(guesses)
-        for guess in guesses:
-            if guess in self._S:
-                return list(guess)
-        return list(guesses[0])
+            bestGuesses.append(guess)
+        return bestScore, bestGuesses
 
-    def _mergeSort(self, l: list) -> list:
+    def __getGuessClasses(self) -> np.ndarray | None:
         """
-        A function that sorts a list using the mergesort algorithm.
+        Returns an array of the class of each guess in C, or None if every guess is in its own class.
+        Two guesses are in the same class if a permutation of the colours and positions that leaves
+        every previous guess unchanged maps one to the other. The permutations used are:
+            - any permutation of the colours that are not in any previous guess
+            - any permutation of the positions that have the same colour in every previous guess
+        Such a permutation also leaves S unchanged, so guesses in the same class split S the same way.
+        The class of a guess is its smallest encoded form under these permutations.
+        If there is a time budget, the classes are only used if they take less than half of the time left,
+        so that there is still time to score the guesses.
         """
-        #######################################
-        # GROUP A SKILL: MERGESORT            #
-        # GROUP A SKILL: RECURSIVE ALGORITHMS #
-        # GROUP A SKILL: LIST OPERATIONS      #
-        #######################################
-        # basis case
-        if len(l) == 1:
-            return l
-        # find the middle of the list
-        midPoint = len(l) // 2
-        # split the list into two halves
-        lHalf = l[:midPoint]
-        rHalf = l[midPoint:]
-        # recursively sort the two halves
-        lHalf = self._mergeSort(lHalf)
-        rHalf = self._mergeSort(rHalf)
-        # merge the two halves
-        newList = []
-        while len(lHalf) > 0 and len(rHalf) > 0:
-            if lHalf[0] < rHalf[0]:
-                newList.append(lHalf.pop(0))
+        if self._lazy:
+            return None
+        if self.__deadline is not None:
+            symmetryDeadline = (perf_counter() + self.__deadline) / 2
+        previousGuesses = [
+            decodeCode(guess, self._lengthOfCode, self._colourNum)
+            for guess in self._previousGuesses
+        ]
+        usedColours = {colour for guess in previousGuesses for colour in guess}
+        freeColours = [i for i in self._colourOptions if i not in usedColours]
+        # group the positions by the colours previous guesses had in them
+        positionGroups = {}
+        for i in range(self._lengthOfCode):
+            column = tuple(guess[i] for guess in previousGuesses)
+            positionGroups.setdefault(column, []).append(i)
+        positionGroups = list(positionGroups.values())
+        numberOfPermutations = 1
+        for group in positionGroups:
+            numberOfPermutations *= perm(len(group))
+        if len(freeColours) <= 1 and numberOfPermutations == 1:
+            return None
+        if numberOfPermutations > self.SYMMETRY_LIMIT:
+            positionGroups = [[i] for i in range(self._lengthOfCode)]
+        isFree = np.zeros(self._colourNum + 1, dtype=bool)
+        isFree[freeColours] = True
+        guessClasses = None
+        for groupPermutations in product(
+            *(permutations(group) for group in positionGroups)
+        ):
+            if self.__deadline is not None and perf_counter() >= symmetryDeadline:
+                return None
+            positions = list(range(self._lengthOfCode))
+            for group, groupPermutation in zip(positionGroups, groupPermutations):
+                for i, position in zip(group, groupPermutation):
+                    positions[i] = position
+            codes = self.__relabelFreeColours(
+                self._codeArray[:, positions], isFree, freeColours
+            )
+            encodedCodes = encodeCodes(codes, self._colourNum)
+            if guessClasses is None:
+                guessClasses = encodedCodes
             else:
-                newList.append(rHalf.pop(0))
-        # add the remaining elements to the list
-        if len(lHalf) > 0:
-            newList += lHalf
-        if len(rHalf) > 0:
-            newList += rHalf
-        return newList
+                np.minimum(guessClasses, encodedCodes, out=guessClasses)
+        return guessClasses
+
+    def __relabelFreeColours(
+        self, codes: np.ndarray, isFree: np.ndarray, freeColours: list[int]
+    ) -> np.ndarray:
+        """
+        Relabels the free colours in each code in the order they first appear,
+        so the first free colour in a code becomes the smallest free colour, and so on.
+        Codes that only differ by a permutation of the free colours are relabelled to the same code.
+        """
+        rows = np.arange(len(codes))
+        # mapping[i, colour] is the colour that colour is relabelled to in code i, or 0 if not yet seen
+        mapping = np.zeros((len(codes), self._colourNum + 1), dtype=codes.dtype)
+        numberRelabelled = np.zeros(len(codes), dtype=np.intp)
+        freeColours = np.array(freeColours, dtype=codes.dtype)
+        for i in range(codes.shape[1]):
+            colours = codes[:, i]
+            new = isFree[colours] & (mapping[rows, colours] == 0)
+            mapping[rows[new], colours[new]] = freeColours[numberRelabelled[new]]
+            numberRelabelled[new] += 1
+        return np.where(isFree[codes], mapping[rows[:, None], codes], codes)
+
+    def __scoreGuessesUntilDeadline(
+        self, candidates: Iterable[int]
+    ) -> tuple[int | float, list[int], bool]:
+        """
+        Scores the candidate guesses in chunks until the deadline passes.
+        The guesses in S are scored first, then the rest of C, each in a random order
+        so that the guesses that are scored are spread across all of the codes.
+        Returns a tuple of the best score, a list of the guesses that have the best score
+        and if every guess was scored.
+        """
+        candidates = np.asarray(candidates)
+        inS = candidates[self._S[candidates]]
+        notInS = candidates[~self._S[candidates]]
+        np.random.shuffle(inS)
+        np.random.shuffle(notInS)
+        order = np.concatenate((inS, notInS))
+        bestScore = float("-inf")
+        bestGuesses = []
+        for start in range(0, len(order), self.TIME_BUDGET_CHUNK):
+            if perf_counter() >= self.__deadline:
+                return bestScore, bestGuesses, False
+            score, guesses = self._scoreGuesses(
+                int(guess) for guess in order[start : start + self.TIME_BUDGET_CHUNK]
+            )
+            if score > bestScore:
+                bestScore = score
+                bestGuesses = guesses
+            elif score == bestScore:
+                bestGuesses += guesses
+        return bestScore, bestGuesses, True
+
+    def __scoreGuessesInParallel(
+        self, candidates: range | list[int]
+    ) -> tuple[int | float, list[int]]:
+        """
+        Splits the candidate guesses into chunks and scores them in the worker processes.
+        S is copied into shared memory once, where all of the workers can read it.
+        Returns a tuple of the best score and a list of all the guesses that have the best score.
+        """
+        if self.__pool is None:
+            self.__sharedS = SharedMemory(create=True, size=max(len(self._S), 1))
+            self.__pool = ProcessPoolExecutor(
+                self.__workers,
+                initializer=_initScoringWorker,
+                initargs=(
+                    type(self),
+                    self._lengthOfCode,
+                    self._colourNum,
+                    self._duplicatesAllowed,
+                    self.__sharedS.name,
+                ),
+            )
+        np.ndarray(self._S.shape, dtype=bool, buffer=self.__sharedS.buf)[:] = self._S
+        # use more chunks than workers so that the work is spread evenly
+        chunkSize = -(-len(candidates) // (self.__workers * 4))
+        chunks = [
+            candidates[start : start + chunkSize]
+            for start in range(0, len(candidates), chunkSize)
+        ]
+        bestScore = float("-inf")
+        bestGuesses = []
+        # the scoring is done in the workers, but each candidate is still scored once
+        self._scoringCalls += len(candidates)
+        for score, guesses in self.__pool.map(_scoreGuessesInWorker, chunks):
+            if score > bestScore:
+                bestScore = score
+                bestGuesses = guesses
+            elif score == bestScore:
+                bestGuesses += guesses
+        return bestScore, bestGuesses
+
+    def __getOpeningBookKey(self) -> str:
+        """
+        Returns the key of the board configuration in the opening book file
+        """
+        return f"{type(self).__name__}:{self._lengthOfCode},{self._colourNum},{self._duplicatesAllowed}"
 
-    def __calcScore(self, guess: list[int]) -> tuple[tuple[int], int]:
+    def __getOpeningBookFile(self) -> str:
+        """
+        Returns the path of the opening book file
+        """
+        return os.path.join(DATA_DIRECTORY, self.OPENING_BOOK)
+
+    def __readOpeningBookFile(self) -> dict:
+        """
+        Reads every opening book in the file.
+        Returns an empty dictionary if the file does not exist, cannot be read
+        or was written by a different version.
+        """
+        try:
+            with open(self.__getOpeningBookFile(), "r") as f:
+                data = json.load(f)
+            if data["version"] != self.OPENING_BOOK_VERSION:
+                return {}
+            books = data["books"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+        return books if isinstance(books, dict) else {}
+
+    def __loadOpeningBook(self) -> dict[str, int] | None:
+        """
+        Loads the opening book for the board configuration, reading the file the first time.
+        Returns None if the opening book is not used.
+        """
+        if self._lazy or self.OPENING_BOOK is None:
+            return None
+        key = (
+            type(self).__name__,
+            self._lengthOfCode,
+            self._colourNum,
+            self._duplicatesAllowed,
+        )
+        if key not in self.__openingBooks:
+            self.__openingBooks[key] = self.__readOpeningBookFile().get(
+                self.__getOpeningBookKey(), {}
+            )
+        return self.__openingBooks[key]
+
+    def __saveOpeningBook(self):
+        """
+        Saves the opening book for the board configuration to the file.
+        The file is written to a temporary file first, so other games never read half a file.
+        """
+        books = self.__readOpeningBookFile()
+        book = books.setdefault(self.__getOpeningBookKey(), {})
+        book.update(self.__openingBook)
+        # the shared book is updated in place with any guesses other processes have stored
+        self.__openingBook.update(book)
+        fileName = self.__getOpeningBookFile()
+        temporaryFile = f"{fileName}.{os.getpid()}.tmp"
+        try:
+            with open(temporaryFile, "w") as f:
+                json.dump({"version": self.OPENING_BOOK_VERSION, "books": books}, f)
+            os.replace(temporaryFile, fileName)
+        except OSError:
+            # the opening book is only used to save time, so the game can continue without it
+            pass
+
+    def close(self):
+        """
+        Shuts down the worker processes and frees the shared memory, if they were created.
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+        if self.__sharedS is not None:
+            self.__sharedS.close()
+            self.__sharedS.unlink()
+            self.__sharedS = None
+
+    def __del__(self):
+        self.close()
+
+    def __calcScore(self, guess: int) -> tuple[int, int | float]:
         """
         Calculates the score of a guess and returns a tuple of the guess and the score.
+        S is split into groups by the response each code would give,
+        and the sizes of the groups are scored by _calcPartitionScore.
+        """
+        groupSizes = np.bincount(self._getResponsesFromS(guess))
+        return (guess, self._calcPartitionScore(groupSizes))
+
+    def _calcPartitionScore(self, groupSizes: np.ndarray) -> int | float:
+        """
+        Scores the sizes of the groups S would be split into by a guess. A higher score is better.
         The score is defined as the best worst case scenario.
-        The minimum number of guesses that must be eliminated if making this guess.
+        The minimum number of guesses that must be eliminated if making this guess,
+        so the worst case is the largest group.
         """
-        minNumber = 999999999
-        for response in self.__genPossibleResponses(guess):
-            num = len(self._S) - len(
-                self._S.difference(
-                    self._getGuessesThatWouldNotGiveSameResponse(guess, list(response))
-                )
+        return self._getSizeOfS() - int(groupSizes.max(initial=0))
+
+
+class ExpectedSize(Knuths):
+    """
+    A variant of knuths algorithm that chooses the guess with the smallest expected size of S after the response.
+    If the code is in a group of size n with probability n / |S|, the expected size is the sum of n^2 / |S|.
+    """
+
+    def _calcPartitionScore(self, groupSizes: np.ndarray) -> int:
+        """
+        Returns the negative sum of the squares of the group sizes,
+        so the guess with the smallest expected size has the highest score.
+        """
+        return -int(np.dot(groupSizes, groupSizes))
+
+
+class Entropy(Knuths):
+    """
+    A variant of knuths algorithm that chooses the guess whose response gives the most information.
+    The information is the entropy of the partition of S: the sum of -p * log2(p) for each group,
+    where p is the fraction of S in the group.
+    """
+
+    def _calcPartitionScore(self, groupSizes: np.ndarray) -> float:
+        """
+        Returns the entropy of the partition.
+        The groups are sorted first, so partitions with the same group sizes have exactly the same score.
+        """
+        p = np.sort(groupSizes[groupSizes > 0]) / self._getSizeOfS()
+        return float(-np.dot(p, np.log2(p)))
+
+
+class MostParts(Knuths):
+    """
+    A variant of knuths algorithm that chooses the guess that splits S into the most groups.
+    """
+
+    def _calcPartitionScore(self, groupSizes: np.ndarray) -> int:
+        """
+        Returns the number of groups that are not empty
+        """
+        return int(np.count_nonzero(groupSizes))
+
+
+class DecisionTree(Algorithm):
+    """
+    A class that plays a precomputed decision tree of knuths algorithm.
+    The tree holds the guess knuths algorithm would play after every possible sequence of responses,
+    so getting the next guess is just a step down the tree.
+    The trees are built offline with saveTree, or by running this file, and are stored on disk,
+    then loaded once and shared by every instance, so no searching is done while playing.
+    If there is no tree for the board, knuths algorithm is used instead.
+    """
+
+    ##################################################
+    # GROUP A SKILL: COMPLEX USER DEFINED ALGORITHMS #
+    ##################################################
+
+    # the file a decision tree is stored in, formatted with the board configuration
+    DECISION_TREE = "decisionTree_{}_{}_{}.json"
+    # the version of the stored trees, which is changed whenever knuths algorithm or the file format changes
+    # so that trees built by an older version are not used
+    TREE_VERSION = 1
+    # the decision trees that have already been loaded, keyed by board configuration
+    # each tree is a tuple of the guess at each node and the children of each node
+    # the children of a node are a dictionary of the response to the index of the child node
+    # a board with no usable tree is stored as None, so its file is not opened again
+    __trees: dict[
+        tuple[int, int, bool], tuple[list[int], list[dict[int, int]]] | None
+    ] = {}
+
+    def __init__(
+        self,
+        lengthOfCode: int,
+        colourNum: int,
+        duplicatesAllowed: bool,
+        timeBudget: float | None = None,
+    ):
+        """
+        The time budget is only used by knuths algorithm if there is no tree for the board.
+        """
+        super().__init__(lengthOfCode, colourNum, duplicatesAllowed)
+        self.__tree = self.getTree(lengthOfCode, colourNum, duplicatesAllowed)
+        # the index of the node of the last guess, or None if no guesses have been made
+        self.__node = None
+        self.__fallback = None
+        if self.__tree is None:
+            self.__fallback = Knuths(
+                lengthOfCode, colourNum, duplicatesAllowed, timeBudget=timeBudget
             )
-            if num < minNumber:
-                minNumber = num
-        return (tuple(guess), minNumber)
 
-    def __genPossibleResponses(self, guess: list[int]) -> set[tuple[int]]:
+    def getNextGuess(self, previousResponse: int = None) -> int:
+        """
+        Gets the next encoded guess by following the response down the tree.
+        """
+        if self.__fallback is not None:
+            return self.__fallback.getNextGuess(previousResponse)
+        guesses, children = self.__tree
+        if self.__node is None:
+            self.__node = 0
+        elif previousResponse is None:
+            raise ValueError("previousResponse cannot be None")
+        elif previousResponse not in children[self.__node]:
+            raise ValueError("No possible guesses")
+        else:
+            self.__node = children[self.__node][previousResponse]
+        return guesses[self.__node]
+
+    def getScoringCalls(self) -> int:
+        if self.__fallback is not None:
+            return self.__fallback.getScoringCalls()
+        return self._scoringCalls
+
+    def getConsistentSetSize(self) -> int | None:
+        if self.__fallback is not None:
+            return self.__fallback.getConsistentSetSize()
+        return None
+
+    @classmethod
+    def getTreeFile(
+        cls, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool
+    ) -> str:
+        """
+        Returns the path of the file the decision tree for the board configuration is stored in
+        """
+        return os.path.join(
+            DATA_DIRECTORY,
+            cls.DECISION_TREE.format(lengthOfCode, colourNum, duplicatesAllowed),
+        )
+
+    @classmethod
+    def getTree(
+        cls, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool
+    ) -> tuple[list[int], list[dict[int, int]]] | None:
+        """
+        Returns the decision tree for the board configuration, loading it from disk the first time.
+        Returns None if no tree has been stored, or it was stored by a different version.
+        """
+        key = (lengthOfCode, colourNum, duplicatesAllowed)
+        if key not in cls.__trees:
+            cls.__trees[key] = cls.__loadTree(*key)
+        return cls.__trees[key]
+
+    @classmethod
+    def __loadTree(
+        cls, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool
+    ) -> tuple[list[int], list[dict[int, int]]] | None:
         """
-        Returns a set of all possible responses to a guess.
+        Reads the decision tree for the board configuration from disk.
+        Returns None if the file does not exist, cannot be read or was written by a different version.
         """
-        possibleResponses = set()
-        for code in self._S:
-            possibleResponses.add(tuple(self._getResponse(guess, list(code))))
-        return possibleResponses
+        try:
+            fileName = cls.getTreeFile(lengthOfCode, colourNum, duplicatesAllowed)
+            with open(fileName, "r") as f:
+                data = json.load(f)
+            if data["version"] != cls.TREE_VERSION:
+                return None
+            tree = (
+                data["guesses"],
+                [
+                    {int(response): child for response, child in node.items()}
+                    for node in data["children"]
+                ],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            ######################
+            # EXCEPTION HANDLING #
+            ######################
+            return None
+        return tree
+
+    @classmethod
+    def saveTree(cls, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool):
+        """
+        Builds the decision tree for the board configuration and stores it on disk.
+        The tree is written to a temporary file first, so a game never reads half a tree.
+        Raises ValueError if the board is too large to build a tree.
+        """
+        key = (lengthOfCode, colourNum, duplicatesAllowed)
+        if getNumberOfCodes(*key) > TABLE_SIZE_LIMIT:
+            raise ValueError("The board is too large to build a decision tree")
+        tree = cls.buildTree(*key)
+        fileName = cls.getTreeFile(*key)
+        temporaryFile = f"{fileName}.{os.getpid()}.tmp"
+        with open(temporaryFile, "w") as f:
+            json.dump(
+                {"version": cls.TREE_VERSION, "guesses": tree[0], "children": tree[1]},
+                f,
+            )
+        os.replace(temporaryFile, fileName)
+        cls.__trees[key] = tree
+
+    @staticmethod
+    def buildTree(
+        lengthOfCode: int, colourNum: int, duplicatesAllowed: bool
+    ) -> tuple[list[int], list[dict[int, int]]]:
+        """
+        Builds the decision tree of knuths algorithm for the board configuration.
+        Each node is the guess knuths algorithm plays for its S, and its children are
+        the nodes for the S that is left after each response the guess could get.
+        """
+        knuths = Knuths(
+            lengthOfCode, colourNum, duplicatesAllowed, useOpeningBook=False
+        )
+        correctResponse = lengthOfCode * (lengthOfCode + 1)
+        guesses = []
+        children = []
+        # a stack of the nodes to calculate, as a tuple of the node index, its S and the guesses before it
+        stack = [(0, np.ones(len(knuths._codes), dtype=bool), [])]
+        guesses.append(None)
+        children.append({})
+        while stack:
+            node, S, previousGuesses = stack.pop()
+            knuths._S = S
+            knuths._SIndices = None
+            knuths._previousGuesses = previousGuesses
+            if node == 0:
+                guess = knuths._genInitialGuess()
+            else:
+                guess = knuths._genNextGuess()
+            guesses[node] = guess
+            indicesOfS = knuths._getIndicesOfS()
+            responses = knuths._getResponsesFromS(knuths._getIndex(guess))
+            for response in np.unique(responses):
+                if response == correctResponse:
+                    continue
+                childS = np.zeros_like(S)
+                childS[indicesOfS[responses == response]] = True
+                children[node][int(response)] = len(guesses)
+                stack.append((len(guesses), childS, previousGuesses + [guess]))
+                guesses.append(None)
+                children.append({})
+        return guesses, children
+
+
+# the algorithm used by a worker process to score guesses for Knuths
+_workerAlgorithm: Knuths | None = None
+_workerSharedS: SharedMemory | None = None
+
+
+def _initScoringWorker(
+    algorithmType: type[Knuths],
+    lengthOfCode: int,
+    colourNum: int,
+    duplicatesAllowed: bool,
+    sharedSName: str,
+):
+    """
+    Runs when a worker process starts.
+    Creates the algorithm the worker uses, and connects to the shared memory that S is sent in.
+    """
+    global _workerAlgorithm, _workerSharedS
+    _workerAlgorithm = algorithmType(
+        lengthOfCode, colourNum, duplicatesAllowed, useOpeningBook=False
+    )
+    _workerSharedS = SharedMemory(name=sharedSName)
+
+
+def _scoreGuessesInWorker(chunk: range | list[int]) -> tuple[int | float, list[int]]:
+    """
+    Scores the guesses in the chunk against the S in shared memory.
+    Returns a tuple of the best score and a list of the guesses that have the best score.
+    """
+    S = _workerAlgorithm._S
+    S[:] = np.ndarray(S.shape, dtype=bool, buffer=_workerSharedS.buf)
+    _workerAlgorithm._SIndices = None
+    return _workerAlgorithm._scoreGuesses(chunk)
+
+
+def usage():
+    print(
+        f"""
+    Usage: {argv[0]} <length> <colourNum> [duplicatesAllowed]
+    Builds the decision tree for the board configuration and stores it for DecisionTree to use
+    length            : the length of the code
+    colourNum         : the number of colours
+    duplicatesAllowed : y or n (default y)"""
+    )
+    quit()
+
+
+if __name__ == "__main__":
+    if not 3 <= len(argv) <= 4 or not all(arg.isdigit() for arg in argv[1:3]):
+        usage()
+    key = (int(argv[1]), int(argv[2]), argv[3] != "n" if len(argv) > 3 else True)
+    startTime = perf_counter()
+    try:
+        DecisionTree.saveTree(*key)
+    except ValueError as e:
+        print(e)
+        quit()
+    print(
+        f"Stored the decision tree in {DecisionTree.getTreeFile(*key)} "
+        f"in {perf_counter() - startTime:.2f}s"
+    )
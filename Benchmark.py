@@ -0,0 +1,150 @@
+import json
+from sys import argv
+from timeit import Timer
+from typing import Callable
+
+import Algorithms as alg
+from Board import Board
+from Feedback import decodeCode, encodeResponse
+
+# the file the baseline timings are saved to and compared against
+BASELINE = "benchmarkBaseline.json"
+# a benchmark fails if it is more than this fraction slower than the baseline
+DEFAULT_THRESHOLD = 0.25
+# the board configurations that are benchmarked, as (lengthOfCode, colourNum, duplicatesAllowed)
+BOARDS = [(4, 6, True), (5, 8, True), (6, 6, False)]
+
+
+def genBoardBenchmarks(
+    lengthOfCode: int, colourNum: int, duplicatesAllowed: bool
+) -> dict[str, Callable]:
+    """
+    Returns a dictionary of the name of each benchmark to the function that is timed.
+    Everything that is not being timed is set up before the functions are returned.
+    """
+    algorithm = alg.RandomConsistent(lengthOfCode, colourNum, duplicatesAllowed)
+    code = decodeCode(
+        int(algorithm._codes[len(algorithm._codes) // 3]), lengthOfCode, colourNum
+    )
+    guess = decodeCode(algorithm._genInitialGuess(), lengthOfCode, colourNum)
+    board = Board(lengthOfCode, 1, duplicatesAllowed, colourNum)
+    board.setCode(code)
+    response = encodeResponse(board.makeGuess(guess)[0], lengthOfCode)
+    guessIndex = algorithm._getIndex(algorithm._genInitialGuess())
+
+    def makeGuess():
+        board = Board(lengthOfCode, 1, duplicatesAllowed, colourNum)
+        board.setCode(code)
+        board.makeGuess(guess)
+
+    def removeGuesses():
+        # S is reset to every code first, so each run prunes the same S
+        algorithm._S[:] = True
+        algorithm._SIndices = None
+        algorithm._removeGuessesThatWouldNotGiveSameResponse(guessIndex, response)
+
+    # knuths is benchmarked on its third guess, with S reduced by the responses to two fixed guesses
+    # the second guess is fixed, as calculating it takes too long on the larger boards
+    knuths = alg.Knuths(
+        lengthOfCode, colourNum, duplicatesAllowed, useOpeningBook=False
+    )
+    knuths.getNextGuess()
+    secondGuessIndex = len(knuths._codes) * 2 // 3
+    secondBoard = Board(lengthOfCode, 2, duplicatesAllowed, colourNum)
+    secondBoard.setCode(code)
+    secondBoard.makeGuess(guess)
+    secondBoard.makeGuess(
+        decodeCode(int(knuths._codes[secondGuessIndex]), lengthOfCode, colourNum)
+    )
+    for index, previousResponse in zip(
+        [guessIndex, secondGuessIndex], secondBoard.getEncodedResults()
+    ):
+        knuths._removeGuessesThatWouldNotGiveSameResponse(index, previousResponse)
+    knuths._previousGuesses = secondBoard.getEncodedGuesses()
+
+    return {
+        "Board.makeGuess": makeGuess,
+        "Board.__genGuessResult": lambda: board._Board__genGuessResult(guess),
+        "RandomConsistent._getResponse": lambda: algorithm._getResponse(guess, code),
+        "RandomConsistent._removeGuessesThatWouldNotGiveSameResponse": removeGuesses,
+        "Knuths._genNextGuess": knuths._genNextGuess,
+    }
+
+
+def timeFunction(function: Callable, repeats: int = 5) -> float:
+    """
+    Returns the fastest time taken to run the function once, in seconds.
+    The function is run enough times in each repeat to take at least 0.2 seconds.
+    """
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeats, number)) / number
+
+
+def runBenchmarks() -> dict[str, float]:
+    """
+    Runs every benchmark on every board, and returns a dictionary of the name of each benchmark to its time.
+    """
+    results = {}
+    for board in BOARDS:
+        for name, function in genBoardBenchmarks(*board).items():
+            key = f"{name}[{board[0]}x{board[1]}{'' if board[2] else ' no duplicates'}]"
+            results[key] = timeFunction(function)
+            print(f"{key}: {results[key] * 1e6:.2f}us")
+    return results
+
+
+def compareToBaseline(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    """
+    Compares the results to the baseline.
+    Returns a list of the benchmarks that are more than threshold slower than the baseline.
+    """
+    regressions = []
+    for key, time in results.items():
+        if key not in baseline:
+            continue
+        change = time / baseline[key] - 1
+        print(f"{key}: {change:+.1%}")
+        if change > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def usage():
+    print(
+        f"""
+    Usage: {argv[0]} [save | compare [threshold]]
+    save    : run the benchmarks and save the timings as the baseline in {BASELINE}
+    compare : run the benchmarks and fail if any are more than threshold slower than the baseline
+              (default {DEFAULT_THRESHOLD}, meaning 25% slower)"""
+    )
+    quit(2)
+
+
+if __name__ == "__main__":
+    if len(argv) == 2 and argv[1] == "save":
+        results = runBenchmarks()
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Saved the baseline to {BASELINE}")
+    elif 2 <= len(argv) <= 3 and argv[1] == "compare":
+        try:
+            threshold = float(argv[2]) if len(argv) == 3 else DEFAULT_THRESHOLD
+            with open(BASELINE, "r") as f:
+                baseline = json.load(f)
+        except ValueError:
+            usage()
+        except OSError:
+            print(f"There is no baseline, run {argv[0]} save first")
+            quit(2)
+        regressions = compareToBaseline(runBenchmarks(), baseline, threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed:")
+            for key in regressions:
+                print(f"    {key}")
+            quit(1)
+        print("No benchmarks regressed")
+    else:
+        usage()
@@ -1,5 +1,13 @@
 from random import choice, sample
 
+from Feedback import (
+    decodeCode,
+    decodeResponse,
+    encodeCode,
+    encodeResponse,
+    getResponse,
+)
+
 
 class Board:
     """
@@ -23,15 +31,9 @@ class Board:
         self.__colourNums = [i for i in range(1, colourNum + 1)]
         self.__resultNums = resultNums
         self.__guessPointer = 0
-        ###########################################
-        # GROUP B SKILL: MULTI-DIMENSIONAL ARRAYS #
-        ###########################################
-        self.__guesses: list[list[int | None]] = [
-            [None for _ in range(length)] for _ in range(totalGuesses)
-        ]
-        self.__results: list[list[int | None]] = [
-            [None for _ in range(length)] for _ in range(totalGuesses)
-        ]
+        # the guesses and results are stored encoded as integers, see Feedback.py
+        self.__guesses: list[int | None] = [None for _ in range(totalGuesses)]
+        self.__results: list[int | None] = [None for _ in range(totalGuesses)]
         self.__code: list[int] | None = None
 
     def getColours(self):
@@ -56,9 +58,9 @@ class Board:
         """
         Makes a guess and returns a tuple containing the result, the number of guesses remaining, if the guess was correct
         """
-        self.__guesses[self.__guessPointer] = guess
         result = self.__genGuessResult(guess)
-        self.__results[self.__guessPointer] = result
+        self.__guesses[self.__guessPointer] = encodeCode(guess, len(self.__colourNums))
+        self.__results[self.__guessPointer] = encodeResponse(result, self.__lenOfGuess)
         if result == [1] * self.__lenOfGuess:
             codeCorrect = True
         else:
@@ -66,13 +68,21 @@ class Board:
         self.__guessPointer += 1
         return (result, self.getRemainingGuesses(), codeCorrect)
 
+    def addEncodedGuess(self, encodedGuess: int, encodedResult: int):
+        """
+        Adds a guess and its result that were made on another board, such as one received over the network.
+        The result is not checked, as the code may not be known.
+        """
+        if self.__guessPointer == self.__totalGuesses:
+            raise ValueError("There are no guesses remaining")
+        self.__guesses[self.__guessPointer] = encodedGuess
+        self.__results[self.__guessPointer] = encodedResult
+        self.__guessPointer += 1
+
     def __genGuessResult(self, guess: list[int]) -> list:
         """
         Returns a list of the result of a guess
         """
-        ##################################
-        # GROUP A SKILL: LIST OPERATIONS #
-        ##################################
         # checks that the guess is in the correct format
         if self.__code == None:
             raise ValueError("Code is not set")
@@ -82,21 +92,7 @@ class Board:
             raise ValueError("Guess contains invalid colour")
         else:
             # calculates the result
-            result = []
-            tempCode = self.__code.copy()
-            tempGuess = guess.copy()
-            for i in range(len(guess)):
-                if self.__code[i] == guess[i]:
-                    result.append(1)
-                    tempCode[i] = None
-                    tempGuess[i] = None
-            tempGuess = [x for x in tempGuess if x is not None]
-            tempCode = [x for x in tempCode if x is not None]
-            for i in range(len(tempGuess)):
-                if tempGuess[i] in tempCode:
-                    result.append(2)
-                    tempCode.pop(tempCode.index(tempGuess[i]))
-            return result
+            return getResponse(guess, self.__code)
 
     def getGuesses(self) -> list[list[int]]:
         """
@@ -104,18 +100,32 @@ class Board:
         """
         guesses = []
         for i in range(self.__guessPointer):
-            guesses.append(self.__guesses[i])
+            guesses.append(
+                decodeCode(self.__guesses[i], self.__lenOfGuess, len(self.__colourNums))
+            )
         return guesses
 
+    def getEncodedGuesses(self) -> list[int]:
+        """
+        Returns the already made guesses, encoded as integers
+        """
+        return self.__guesses[: self.__guessPointer]
+
     def getResults(self) -> list[list[int]]:
         """
         Returns the results of the guesses
         """
         results = []
         for i in range(self.__guessPointer):
-            results.append(self.__results[i])
+            results.append(decodeResponse(self.__results[i], self.__lenOfGuess))
         return results
 
+    def getEncodedResults(self) -> list[int]:
+        """
+        Returns the results of the guesses, encoded as integers
+        """
+        return self.__results[: self.__guessPointer]
+
     def setCode(self, code: list[int] | None = None):
         """
         Sets the code for the board.
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+
+from Sockets import SocketManager
+from WireFormat import WireFormat
+
+messages = SocketManager.possibleMessages
+
+
+class Spectator:
+    """
+    A connection to a spectator, with the messages that are waiting to be written to it.
+    Board messages are full snapshots, so a board waiting to be written is replaced by a newer one.
+    If too many messages are waiting, they are all replaced by the latest board,
+    so a slow spectator skips ahead instead of the messages building up forever.
+    """
+
+    # the most messages that can wait to be written to a spectator
+    MAX_PENDING = 16
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.closing = False
+        self.__pending: list[bytes] = []
+        self.__lastIsBoard = False
+        self.__latestBoard: bytes | None = None
+        # set when there are messages waiting to be written
+        self.__ready = asyncio.Event()
+
+    def add(self, frame: bytes, isBoard: bool):
+        """
+        Adds a message to be written to the spectator
+        """
+        if isBoard and self.__pending and self.__lastIsBoard:
+            self.__pending[-1] = frame
+        else:
+            self.__pending.append(frame)
+        if isBoard:
+            self.__latestBoard = frame
+        self.__lastIsBoard = isBoard
+        if len(self.__pending) > self.MAX_PENDING:
+            self.__pending = [self.__latestBoard] if self.__latestBoard else []
+            self.__lastIsBoard = self.__latestBoard is not None
+        self.__ready.set()
+
+    def close(self):
+        """
+        Writes any waiting messages, then closes the connection
+        """
+        self.closing = True
+        self.__ready.set()
+
+    async def write(self):
+        """
+        Writes the messages to the spectator as they arrive, until it is closed.
+        Only one write is waited for at a time, and any messages that arrive in the meantime are merged.
+        """
+        while not self.closing or self.__pending:
+            await self.__ready.wait()
+            self.__ready.clear()
+            frames, self.__pending = self.__pending, []
+            self.__lastIsBoard = False
+            if frames:
+                self.writer.writelines(frames)
+                await self.writer.drain()
+
+
+class Broadcaster:
+    """
+    Sends the messages of a game to any number of read-only spectators.
+    Each message is encoded once, with every board sent in full,
+    and is then written to every spectator by an event loop in a background thread,
+    so a slow spectator never holds up the game or the other spectators.
+    The messages are the same as the ones sent to a clientPlayer, so a clientPlayer can be used to spectate.
+    """
+
+    ##############################################
+    # GROUP A SKILL: COMPLEX CLIENT-SERVER MODEL #
+    ##############################################
+
+    # the number of connections that can wait to be accepted
+    BACKLOG = 1024
+    # the longest time to wait for the last messages to be written when closing, in seconds
+    CLOSE_TIMEOUT = 1.0
+
+    def __init__(self, host: str, port: int):
+        """
+        Starts listening for spectators on the host and port.
+        """
+        self.__host = host
+        self.__port = port
+        self.__spectators: dict[Spectator, asyncio.Task] = {}
+        # the last board sent, which is sent to spectators as soon as they join
+        self.__latestBoard: bytes | None = None
+        self.__server: asyncio.Server | None = None
+        self.__error: OSError | None = None
+        self.__closed = False
+        self.__loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, args=(ready,), daemon=True)
+        self.__thread.start()
+        ready.wait()
+        if self.__error is not None:
+            self.__thread.join()
+            raise self.__error
+
+    def __run(self, ready: threading.Event):
+        """
+        Runs the event loop in the background thread
+        """
+        asyncio.set_event_loop(self.__loop)
+        try:
+            self.__server = self.__loop.run_until_complete(
+                asyncio.start_server(
+                    self.__handleSpectator,
+                    self.__host,
+                    self.__port,
+                    backlog=self.BACKLOG,
+                )
+            )
+        except OSError as e:
+            ######################
+            # EXCEPTION HANDLING #
+            ######################
+            self.__error = e
+            self.__loop.close()
+            return
+        finally:
+            ready.set()
+        self.__loop.run_forever()
+        self.__loop.close()
+
+    def getNumSpectators(self) -> int:
+        return len(self.__spectators)
+
+    def broadcast(self, msg: messages, *args):
+        """
+        Encodes the message once and sends it to every spectator.
+        This can be called from any thread, and does not wait for the message to be written.
+        """
+        if self.__closed:
+            return
+        # a new wire format is used every time, so boards are sent in full rather than as changes
+        frame = SocketManager.encodeFrame(msg, WireFormat().encode(list(args)))
+        self.__loop.call_soon_threadsafe(
+            self.__addFrame, frame, msg == messages.DISPLAY_BOARD
+        )
+
+    def __addFrame(self, frame: bytes, isBoard: bool):
+        """
+        Adds the message to every spectator, on the event loop
+        """
+        if isBoard:
+            self.__latestBoard = frame
+        for spectator in self.__spectators:
+            spectator.add(frame, isBoard)
+
+    async def __handleSpectator(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """
+        Called for each spectator that connects.
+        Writes the messages to it until either end closes the connection.
+        """
+        spectator = Spectator(writer)
+        self.__spectators[spectator] = asyncio.current_task()
+        if self.__latestBoard is not None:
+            spectator.add(self.__latestBoard, True)
+        try:
+            await spectator.write()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            del self.__spectators[spectator]
+            writer.close()
+
+    async def __close(self):
+        """
+        Stops accepting spectators and closes every connection once its messages are written
+        """
+        self.__server.close()
+        for spectator in self.__spectators:
+            spectator.close()
+        tasks = list(self.__spectators.values())
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.CLOSE_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self.__server.wait_closed()
+
+    def close(self):
+        """
+        Closes every connection and stops the background thread
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        asyncio.run_coroutine_threadsafe(self.__close(), self.__loop).result()
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
@@ -223,6 +223,41 @@ class dataBaseManager:
                 ),
             )
 
+    def addToStatsTables(self, statsTables: list[Statistics]):
+        """
+        Adds each of the statistics to the statistics of that user in a single transaction.
+        Users that do not exist are created without a password, so they cannot be logged in to.
+        """
+        with openDB(self.db) as cur:
+            cur.executemany(
+                """INSERT INTO users (username, wins, losses, draws, totalGames, roundsPlayed, timePlayed) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(username) DO UPDATE SET wins = wins + excluded.wins, losses = losses + excluded.losses, draws = draws + excluded.draws, totalGames = totalGames + excluded.totalGames, roundsPlayed = roundsPlayed + excluded.roundsPlayed, timePlayed = ROUND(timePlayed + excluded.timePlayed, 2)""",
+                [
+                    (
+                        stats.username,
+                        stats.wins,
+                        stats.losses,
+                        stats.draws,
+                        stats.totalGames,
+                        stats.roundsPlayed,
+                        round(stats.timePlayed, 2),
+                    )
+                    for stats in statsTables
+                ],
+            )
+
+    def savePastGames(self, pastGames: list[tuple]):
+        """
+        Saves many past games in a single transaction.
+        Each past game is a tuple of the arguments to savePastGame, in the same order.
+        """
+        date = strftime("%d/%m/%Y")
+        with openDB(self.db) as cur:
+            cur.executemany(
+                """INSERT INTO pastGames (player1, player2, winner, lengthOfCode, numGuesses, numRounds, colourNum, duplicatesAllowed, date, timeTaken, mode) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(*pastGame[:8], date, *pastGame[8:]) for pastGame in pastGames],
+            )
+
     def getPastGames(self, username: str) -> list[tuple]:
         with openDB(self.db) as cur:
             cur.execute(
@@ -0,0 +1,330 @@
+from collections import OrderedDict
+from itertools import permutations, product
+from math import perm
+from typing import Callable
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional, without it the responses are calculated with pure python and numpy instead
+    njit = None
+
+# the largest number of codes for which a dense table of responses will be built
+# a table of this size takes up at most 32MB
+TABLE_SIZE_LIMIT = 4096
+# the number of board configurations that code universes and tables are kept in memory for
+CACHE_SIZE = 4
+
+
+def encodeResponse(response: list[int], lengthOfCode: int) -> int:
+    """
+    Encodes a response of 1s and 2s as a single integer.
+    The encoding is <no. of 1s> * (lengthOfCode + 1) + <no. of 2s>
+    """
+    return response.count(1) * (lengthOfCode + 1) + response.count(2)
+
+
+def decodeResponse(encodedResponse: int, lengthOfCode: int) -> list[int]:
+    """
+    Decodes an encoded response back into a list of 1s and 2s
+    """
+    black, white = divmod(encodedResponse, lengthOfCode + 1)
+    return [1] * black + [2] * white
+
+
+def encodeCode(code: list[int], colourNum: int) -> int:
+    """
+    Encodes a code as a single integer.
+    Each colour is a digit in base colourNum, with the first colour being the most significant.
+    Codes of the same length are therefore ordered the same way as their encodings.
+    """
+    encodedCode = 0
+    for colour in code:
+        encodedCode = encodedCode * colourNum + colour - 1
+    return encodedCode
+
+
+def decodeCode(encodedCode: int, lengthOfCode: int, colourNum: int) -> list[int]:
+    """
+    Decodes an encoded code back into a list of colours
+    """
+    code = [0 for _ in range(lengthOfCode)]
+    for i in range(lengthOfCode - 1, -1, -1):
+        encodedCode, digit = divmod(encodedCode, colourNum)
+        code[i] = digit + 1
+    return code
+
+
+def encodeCodes(codes: np.ndarray, colourNum: int) -> np.ndarray:
+    """
+    Encodes every row of a 2D array of codes, returning an array of the encoded codes
+    """
+    encodedCodes = np.zeros(len(codes), dtype=np.int64)
+    for i in range(codes.shape[1]):
+        encodedCodes = encodedCodes * colourNum + codes[:, i] - 1
+    return encodedCodes
+
+
+def genCodeArray(
+    lengthOfCode: int, colourNum: int, duplicatesAllowed: bool
+) -> np.ndarray:
+    """
+    Returns a 2D array of all possible codes in lexicographic order
+    """
+    colourOptions = [i for i in range(1, colourNum + 1)]
+    if duplicatesAllowed:
+        codes = product(colourOptions, repeat=lengthOfCode)
+    else:
+        codes = permutations(colourOptions, r=lengthOfCode)
+    return np.array(list(codes), dtype=np.int8).reshape(-1, lengthOfCode)
+
+
+def getNumberOfCodes(lengthOfCode: int, colourNum: int, duplicatesAllowed: bool) -> int:
+    """
+    Returns the number of possible codes for the board configuration
+    """
+    if duplicatesAllowed:
+        return colourNum**lengthOfCode
+    return perm(colourNum, lengthOfCode)
+
+
+def getColourCounts(codes: np.ndarray, colourNum: int) -> np.ndarray:
+    """
+    Takes a 2D array of codes and returns a 2D array of how many times each colour appears in each code.
+    Column i is the count of colour i, so column 0 is always 0.
+    """
+    counts = np.zeros((len(codes), colourNum + 1), dtype=np.int8)
+    rows = np.arange(len(codes))
+    for i in range(codes.shape[1]):
+        counts[rows, codes[:, i]] += 1
+    return counts
+
+
+def getResponse(guess: list[int], code: list[int]) -> list[int]:
+    """
+    Returns a list of the result of the guess against the code.
+    There is a 1 for each colour in the right position, then a 2 for each other colour in the code.
+    If numba is installed, a compiled loop is used, otherwise it is done in pure python.
+    """
+    if _compiledGetResponse is None:
+        return _getResponsePython(guess, code)
+    # the compiled loop is given tuples, which numba converts much faster than lists
+    black, white = _compiledGetResponse(tuple(guess), tuple(code))
+    return [1] * black + [2] * white
+
+
+def _getResponsePython(guess: list[int], code: list[int]) -> list[int]:
+    """
+    The pure python version of getResponse, used if numba is not installed.
+    """
+    ##################################
+    # GROUP A SKILL: LIST OPERATIONS #
+    ##################################
+    result = []
+    tempCode = list(code)
+    tempGuess = list(guess)
+    for i in range(len(guess)):
+        if code[i] == guess[i]:
+            result.append(1)
+            tempCode[i] = None
+            tempGuess[i] = None
+    tempGuess = [x for x in tempGuess if x is not None]
+    tempCode = [x for x in tempCode if x is not None]
+    for i in range(len(tempGuess)):
+        if tempGuess[i] in tempCode:
+            result.append(2)
+            tempCode.pop(tempCode.index(tempGuess[i]))
+    return result
+
+
+def _getResponseLoop(guess: tuple, code: tuple) -> tuple[int, int]:
+    """
+    The same as getResponse, but written as loops so it can be compiled by numba.
+    Returns a tuple of the number of 1s and the number of 2s.
+    """
+    black = 0
+    for i in range(len(guess)):
+        if guess[i] == code[i]:
+            black += 1
+    # each position in the code can only be matched by one colour in the guess
+    used = np.zeros(len(code), dtype=np.bool_)
+    total = 0
+    for i in range(len(guess)):
+        for j in range(len(code)):
+            if not used[j] and code[j] == guess[i]:
+                used[j] = True
+                total += 1
+                break
+    return black, total - black
+
+
+# the compiled version of _getResponseLoop, or None if numba is not installed
+# it is compiled once for each length of code, and the compiled code is cached on disk
+_compiledGetResponse = None if njit is None else njit(cache=True)(_getResponseLoop)
+
+
+def getResponses(
+    guess: list[int] | np.ndarray, codes: np.ndarray, codeCounts: np.ndarray = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Scores one guess against every row of a 2D array of codes in a single pass.
+    Returns a tuple of an array of the number of 1s and an array of the number of 2s.
+    The colour counts of the codes can be passed in if they have already been calculated.
+    If numba is installed, a compiled loop is used, otherwise it is done with numpy.
+    """
+    guess = np.asarray(guess, dtype=codes.dtype)
+    if codeCounts is None:
+        codeCounts = getColourCounts(
+            codes, max(int(codes.max(initial=0)), int(guess.max()))
+        )
+    guessCounts = np.bincount(guess, minlength=codeCounts.shape[1]).astype(
+        codeCounts.dtype
+    )
+    if _compiledGetResponses is not None:
+        return _compiledGetResponses(guess, codes, codeCounts, guessCounts)
+    # the number of 1s is the number of positions that match
+    black = np.count_nonzero(codes == guess, axis=1)
+    # the total number of matching colours is the sum of the smaller count of each colour
+    total = np.minimum(codeCounts, guessCounts).sum(axis=1)
+    return black, total - black
+
+
+def _getResponsesLoop(
+    guess: np.ndarray,
+    codes: np.ndarray,
+    codeCounts: np.ndarray,
+    guessCounts: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The same as getResponses, but written as loops so it can be compiled by numba.
+    Each code is only read once, rather than once for each step like with numpy.
+    """
+    black = np.zeros(len(codes), dtype=np.int64)
+    white = np.zeros(len(codes), dtype=np.int64)
+    for i in range(len(codes)):
+        b = 0
+        for j in range(len(guess)):
+            if codes[i, j] == guess[j]:
+                b += 1
+        total = 0
+        for colour in range(len(guessCounts)):
+            total += min(codeCounts[i, colour], guessCounts[colour])
+        black[i] = b
+        white[i] = total - b
+    return black, white
+
+
+# the compiled version of _getResponsesLoop, or None if numba is not installed
+_compiledGetResponses = None if njit is None else njit(cache=True)(_getResponsesLoop)
+
+
+class CodeUniverse:
+    """
+    Every possible code for a board configuration, in lexicographic order.
+    The codes are available both encoded and as a 2D array, along with how many times each colour
+    appears in each code. The arrays are read only, so one universe can be shared by every algorithm.
+    """
+
+    def __init__(self, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool):
+        self.__codeArray = genCodeArray(lengthOfCode, colourNum, duplicatesAllowed)
+        self.__codes = encodeCodes(self.__codeArray, colourNum)
+        self.__colourCounts = getColourCounts(self.__codeArray, colourNum)
+        for array in (self.__codeArray, self.__codes, self.__colourCounts):
+            array.flags.writeable = False
+
+    def getCodes(self) -> np.ndarray:
+        return self.__codes
+
+    def getCodeArray(self) -> np.ndarray:
+        return self.__codeArray
+
+    def getColourCounts(self) -> np.ndarray:
+        return self.__colourCounts
+
+
+class FeedbackTable:
+    """
+    A table of the encoded response of every possible guess against every possible code.
+    The guesses and codes are referred to by their index in the code universe for the board configuration.
+    """
+
+    ##################################################
+    # GROUP A SKILL: COMPLEX USER DEFINED ALGORITHMS #
+    ##################################################
+
+    def __init__(self, lengthOfCode: int, colourNum: int, duplicatesAllowed: bool):
+        self.__lengthOfCode = lengthOfCode
+        self.__table = self.__genTable(
+            getCodeUniverse(lengthOfCode, colourNum, duplicatesAllowed)
+        )
+        self.__table.flags.writeable = False
+
+    def getResponses(self, guess: int) -> np.ndarray:
+        """
+        Returns an array of the encoded responses of the guess against every code
+        """
+        return self.__table[guess]
+
+    def __genTable(self, universe: CodeUniverse) -> np.ndarray:
+        """
+        Calculates the encoded response of every code against every other code.
+        """
+        codes = universe.getCodeArray()
+        counts = universe.getColourCounts()
+        if (self.__lengthOfCode + 1) ** 2 <= 256:
+            dtype = np.uint8
+        else:
+            dtype = np.uint16
+        table = np.empty((len(codes), len(codes)), dtype=dtype)
+        for i in range(len(codes)):
+            black, white = getResponses(codes[i], codes, counts)
+            table[i] = black * (self.__lengthOfCode + 1) + white
+        return table
+
+
+# the code universes and tables that have already been calculated, keyed by board configuration
+# they are ordered from least to most recently used, so the least recently used can be removed
+_universes: OrderedDict[tuple[int, int, bool], CodeUniverse] = OrderedDict()
+_tables: OrderedDict[tuple[int, int, bool], FeedbackTable] = OrderedDict()
+
+
+def _getCached(cache: OrderedDict, key: tuple, create: Callable):
+    """
+    Returns the value for the key from the cache, calling create to calculate it if it is not there.
+    If the cache is bigger than CACHE_SIZE, the least recently used value is removed.
+    """
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = create(*key)
+    cache[key] = value
+    if len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+
+def getCodeUniverse(
+    lengthOfCode: int, colourNum: int, duplicatesAllowed: bool
+) -> CodeUniverse:
+    """
+    Returns the code universe for the board configuration, calculating it on first use.
+    """
+    return _getCached(
+        _universes, (lengthOfCode, colourNum, duplicatesAllowed), CodeUniverse
+    )
+
+
+def getFeedbackTable(
+    lengthOfCode: int, colourNum: int, duplicatesAllowed: bool
+) -> FeedbackTable | None:
+    """
+    Returns the feedback table for the board configuration, calculating it on first use.
+    Returns None if there are too many possible codes to build a table.
+    """
+    if getNumberOfCodes(lengthOfCode, colourNum, duplicatesAllowed) > TABLE_SIZE_LIMIT:
+        return None
+    return _getCached(
+        _tables, (lengthOfCode, colourNum, duplicatesAllowed), FeedbackTable
+    )
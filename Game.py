@@ -1,5 +1,6 @@
-from time import time
+from time import perf_counter, process_time, time
 
+import Instrumentation
 from Board import Board
 from Player import Player, Terminal
 
@@ -31,6 +32,7 @@ class Game:
         self.__player2RoundWins = 0
         self.__winner = None
         self.__board = None
+        self.__roundNumber = 0
 
     def __createBoard(
         self,
@@ -93,9 +95,22 @@ class Game:
 
     def getNextGuess(self) -> list:
         """
-        Returns the current players next guess
-        """
-        return self.__currentPlayer.getMove(self.__board)
+        Returns the current players next guess.
+        Emits a MoveEvent with the time the player took if anything is subscribed to the events.
+        """
+        startTime, startCpuTime = perf_counter(), process_time()
+        guess = self.__currentPlayer.getMove(self.__board)
+        if Instrumentation.isSubscribed():
+            Instrumentation.emit(
+                Instrumentation.MoveEvent(
+                    self.__currentPlayer.getUsername(),
+                    self.__roundNumber,
+                    len(self.__board.getEncodedGuesses()) + 1,
+                    perf_counter() - startTime,
+                    process_time() - startCpuTime,
+                )
+            )
+        return guess
 
     def setBoardCode(self, random: bool = False):
         """
@@ -208,6 +223,7 @@ class Game:
         """
         startTime = time()
         for i in range(self.__numRounds):
+            self.__roundNumber = i + 1
             self.displayRoundNumber(i + 1)
             self.playGameRound()
             self.switchPlayer()
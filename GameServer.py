@@ -0,0 +1,372 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from sys import argv
+
+from Board import Board
+from DataBaseManager import Statistics, dataBaseManager
+from Game import Game
+from Player import Player
+from Sockets import MessageExchangeError, NoMessageError, SocketManager
+from WireFormat import WireFormat, WireFormatError
+
+messages = SocketManager.possibleMessages
+
+
+class Connection:
+    """
+    A connection to a client, which sends and receives messages without blocking.
+    The messages are framed and encoded in the same way as by SocketManager,
+    so a clientPlayer can connect to a GameServer without any changes.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.__reader = reader
+        self.__writer = writer
+        self.__wireFormat = WireFormat()
+
+    def isClosed(self) -> bool:
+        """
+        Returns True if the client has closed the connection
+        """
+        return self.__reader.at_eof() or self.__writer.is_closing()
+
+    async def sendMessage(self, msg: messages, *args):
+        """
+        Sends a message to the client in a single frame, and waits until it can be written.
+        """
+        try:
+            encodedData = self.__wireFormat.encode(list(args))
+        except WireFormatError as e:
+            raise MessageExchangeError(f"Could not encode message: {e}")
+        self.__writer.write(SocketManager.encodeFrame(msg, encodedData))
+        await self.__writer.drain()
+
+    async def receiveMessage(self) -> tuple[messages, list]:
+        """
+        Waits for a message from the client.
+        It returns a tuple of the message type and the list of data.
+        """
+        ######################
+        # EXCEPTION HANDLING #
+        ######################
+        try:
+            header = await self.__reader.readexactly(SocketManager.FRAME_HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                raise NoMessageError("No message received")
+            raise MessageExchangeError("Connection closed part way through a message")
+        size = SocketManager.getFrameSize(header)
+        try:
+            body = await self.__reader.readexactly(size)
+        except asyncio.IncompleteReadError:
+            raise MessageExchangeError("Connection closed part way through a message")
+        msg, data = SocketManager.decodeFrame(body)
+        try:
+            return msg, self.__wireFormat.decode(data)
+        except WireFormatError as e:
+            raise MessageExchangeError(f"Could not decode message: {e}")
+
+    async def close(self):
+        """
+        Closes the connection, ignoring any errors if the client has already gone.
+        """
+        self.__writer.close()
+        try:
+            await self.__writer.wait_closed()
+        except OSError:
+            pass
+
+
+class remotePlayer(Player):
+    """
+    A player in a game hosted by a GameServer.
+    The game runs in a worker thread and calls this player like any other,
+    but every message is sent and received by the server's event loop,
+    so the worker thread only waits for the result and never touches the socket.
+    If the client takes longer than replyTimeout seconds to reply, the game is abandoned.
+    """
+
+    def __init__(
+        self,
+        stats: Statistics,
+        connection: Connection,
+        loop: asyncio.AbstractEventLoop,
+        replyTimeout: float | None = None,
+    ):
+        super().__init__(stats)
+        self.__connection = connection
+        self.__loop = loop
+        self.__replyTimeout = replyTimeout
+
+    def __run(self, coroutine):
+        """
+        Runs the coroutine on the server's event loop and waits for its result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.__loop).result()
+
+    async def __request(self, msg: messages, expected: messages, board: Board) -> list:
+        """
+        Sends a message with the board and waits for the expected reply,
+        which must be a code of the right length.
+        """
+        await self.__connection.sendMessage(msg, board)
+        try:
+            reply, returnData = await asyncio.wait_for(
+                self.__connection.receiveMessage(), self.__replyTimeout
+            )
+        except asyncio.TimeoutError:
+            raise MessageExchangeError("Timed out waiting for a reply")
+        if reply != expected or len(returnData) != 1:
+            raise MessageExchangeError("Did not receive expected message")
+        code = returnData[0]
+        # the wire format allows other types, which would only fail later when the board uses them
+        if not isinstance(code, list) or len(code) != board.getLenOfGuess():
+            raise MessageExchangeError(f"Invalid code: {code}")
+        return code
+
+    def getMove(self, board: Board) -> list[int]:
+        """
+        Returns the players next guess.
+        """
+        return self.__run(
+            self.__request(messages.GET_MOVE, messages.RETURN_MOVE, board)
+        )
+
+    def getCode(self, board: Board) -> list[int]:
+        """
+        Returns the players code.
+        """
+        return self.__run(
+            self.__request(messages.GET_CODE, messages.RETURN_CODE, board)
+        )
+
+    def displayBoard(self, board: Board, code: list = None):
+        """
+        Displays the board to the player.
+        """
+        self.__run(self.__connection.sendMessage(messages.DISPLAY_BOARD, board, code))
+
+    def displayRoundWinner(self, winner: str):
+        """
+        Displays the winner of the round.
+        """
+        self.__run(self.__connection.sendMessage(messages.DISPLAY_ROUND_WINNER, winner))
+
+    def displayWinner(self, winner: str | None):
+        """
+        Displays the winner of the game.
+        """
+        self.__run(self.__connection.sendMessage(messages.DISPLAY_WINNER, winner))
+
+    def displayRoundNumber(self, roundNumber: int):
+        """
+        Displays the round number.
+        """
+        self.__run(
+            self.__connection.sendMessage(messages.DISPLAY_ROUND_NUMBER, roundNumber)
+        )
+
+
+class GameServer:
+    """
+    Hosts many online games at once on a single port.
+    Clients are matched in the order they connect, and every two clients play a game against each other.
+    All of the sockets are handled by one asyncio event loop, and each game's logic runs in a worker thread,
+    so a slow or stuck client only holds up its own game.
+    """
+
+    ##############################################
+    # GROUP A SKILL: COMPLEX CLIENT-SERVER MODEL #
+    ##############################################
+
+    # the mode the past games are saved with
+    MODE = "ONLINE"
+    # the number of connections that can wait to be accepted, which is more than the default
+    # so that many clients connecting at once are not dropped
+    BACKLOG = 1024
+    # the default time in seconds a client has to reply with a move or a code
+    REPLY_TIMEOUT = 300.0
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        length: int = 4,
+        numGuesses: int = 6,
+        numRounds: int = 3,
+        duplicatesAllowed: bool = True,
+        colourNum: int = 6,
+        maxGames: int = 1000,
+        dataBase: str | None = None,
+        replyTimeout: float | None = REPLY_TIMEOUT,
+    ):
+        """
+        If a client does not reply within replyTimeout seconds, its game is abandoned,
+        so that it does not hold one of the maxGames worker threads forever.
+        """
+        self.__host = host
+        self.__port = port
+        self.__gameSettings = (
+            length,
+            numGuesses,
+            numRounds,
+            duplicatesAllowed,
+            colourNum,
+        )
+        # the number of games that can be played at once, any more wait for a game to finish
+        self.__executor = ThreadPoolExecutor(maxGames)
+        self.__dataBase = dataBase
+        self.__replyTimeout = replyTimeout
+        # the client waiting for an opponent
+        self.__waiting: Connection | None = None
+        self.__numGames = 0
+        self.__activeGames = 0
+        # the tasks of the games being played, so they are not garbage collected
+        self.__tasks: set[asyncio.Task] = set()
+        self.__server: asyncio.Server | None = None
+
+    def getNumGames(self) -> int:
+        return self.__numGames
+
+    def getActiveGames(self) -> int:
+        return self.__activeGames
+
+    async def start(self):
+        """
+        Starts listening for clients
+        """
+        self.__server = await asyncio.start_server(
+            self.__handleClient, self.__host, self.__port, backlog=self.BACKLOG
+        )
+
+    async def serveForever(self):
+        """
+        Starts listening for clients, and keeps hosting games until it is cancelled
+        """
+        if self.__server is None:
+            await self.start()
+        async with self.__server:
+            await self.__server.serve_forever()
+
+    async def close(self):
+        """
+        Stops listening for clients and waits for the games being played to finish
+        """
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+        if self.__waiting is not None:
+            await self.__waiting.close()
+            self.__waiting = None
+        if self.__tasks:
+            await asyncio.gather(*self.__tasks, return_exceptions=True)
+        self.__executor.shutdown()
+
+    def run(self):
+        """
+        Hosts games until the process is interrupted
+        """
+        try:
+            asyncio.run(self.serveForever())
+        except KeyboardInterrupt:
+            pass
+
+    async def __handleClient(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """
+        Called for each client that connects.
+        The client waits for an opponent, or starts a game if another client is already waiting.
+        """
+        connection = Connection(reader, writer)
+        # the waiting client may have given up since it connected
+        if self.__waiting is not None and self.__waiting.isClosed():
+            await self.__waiting.close()
+            self.__waiting = None
+        if self.__waiting is None:
+            self.__waiting = connection
+            return
+        opponent, self.__waiting = self.__waiting, None
+        task = asyncio.create_task(self.__playGame(opponent, connection))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __playGame(self, connection1: Connection, connection2: Connection):
+        """
+        Plays a game between two clients, then disconnects them both.
+        If either client sends something unexpected or disconnects, the game is abandoned.
+        """
+        self.__numGames += 1
+        self.__activeGames += 1
+        gameNumber = self.__numGames
+        loop = asyncio.get_running_loop()
+        player1 = remotePlayer(
+            Statistics(f"Player {gameNumber}.1"), connection1, loop, self.__replyTimeout
+        )
+        player2 = remotePlayer(
+            Statistics(f"Player {gameNumber}.2"), connection2, loop, self.__replyTimeout
+        )
+        game = Game(player1, player2, *self.__gameSettings)
+        try:
+            ######################
+            # EXCEPTION HANDLING #
+            ######################
+            timeTaken, _ = await loop.run_in_executor(self.__executor, game.run)
+        except (MessageExchangeError, OSError, ValueError) as e:
+            print(f"Game {gameNumber} was abandoned: {e}")
+        except Exception as e:
+            # anything else is a bug, but it should only end this game and not the server
+            print(f"Game {gameNumber} was abandoned after an error: {e!r}")
+        else:
+            self.__savePastGame(game, timeTaken)
+        finally:
+            self.__activeGames -= 1
+            for connection in (connection1, connection2):
+                if not connection.isClosed():
+                    try:
+                        await connection.sendMessage(messages.DISCONNECT)
+                    except OSError:
+                        pass
+                await connection.close()
+
+    def __savePastGame(self, game: Game, timeTaken: float):
+        """
+        Saves the game to the database if one was given
+        """
+        if self.__dataBase is None:
+            return
+        length, numGuesses, numRounds, duplicatesAllowed, colourNum = (
+            self.__gameSettings
+        )
+        winner = game.getWinner()
+        dataBaseManager(self.__dataBase).savePastGame(
+            game.getPlayer1().getUsername(),
+            game.getPlayer2().getUsername(),
+            winner.getUsername() if winner is not None else None,
+            length,
+            numGuesses,
+            numRounds,
+            colourNum,
+            duplicatesAllowed,
+            timeTaken,
+            self.MODE,
+        )
+
+
+def usage():
+    print(
+        f"""
+    Usage: {argv[0]} [host] [port]
+    host : the address to listen on (default 0.0.0.0)
+    port : the port to listen on (default 12345)"""
+    )
+    quit()
+
+
+if __name__ == "__main__":
+    if len(argv) > 3 or (len(argv) == 3 and not argv[2].isdigit()):
+        usage()
+    host = argv[1] if len(argv) > 1 else "0.0.0.0"
+    port = int(argv[2]) if len(argv) > 2 else 12345
+    print(f"Hosting games on {host}:{port}")
+    GameServer(host, port).run()
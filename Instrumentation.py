@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass
+class MoveEvent:
+    """
+    Emitted by the game after a player makes a guess.
+    The time includes everything the player did to make the guess,
+    whether that was a human thinking, a message over the network or an algorithm.
+    """
+
+    username: str
+    roundNumber: int
+    guessNumber: int
+    wallTime: float
+    cpuTime: float
+
+
+@dataclass
+class SolverEvent:
+    """
+    Emitted by a computer player after its algorithm calculates a guess.
+    consistentSetSize is the number of codes still consistent with the responses so far,
+    or None if the algorithm does not keep track of them.
+    scoringCalls is the number of times a guess was scored against a set of codes to make this guess.
+    """
+
+    username: str
+    algorithm: str
+    guessNumber: int
+    wallTime: float
+    cpuTime: float
+    consistentSetSize: int | None
+    scoringCalls: int
+
+
+Event = MoveEvent | SolverEvent
+
+# the functions that are called with every event
+_hooks: list[Callable[[Event], None]] = []
+
+
+def subscribe(hook: Callable[[Event], None]):
+    """
+    Adds a function that will be called with every event
+    """
+    _hooks.append(hook)
+
+
+def unsubscribe(hook: Callable[[Event], None]):
+    """
+    Removes a function that was subscribed
+    """
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def isSubscribed() -> bool:
+    """
+    Returns True if there are any hooks, so that events are only created when they will be used
+    """
+    return bool(_hooks)
+
+
+def emit(event: Event):
+    """
+    Calls every hook with the event
+    """
+    for hook in _hooks:
+        hook(event)
@@ -3,21 +3,24 @@ from sys import argv
 from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 
-from UI import GUI, Terminal
+import Algorithms as alg
+from Tournament import Tournament
+from UI import GUI, UI, Terminal
 
 
 def usage():
     print(
         f"""
-    Usage: {argv[0]} [g | t]
+    Usage: {argv[0]} [g | t | c [games] [workers] [algorithm1] [algorithm2]]
     g : play with the GUI
-    t : play with the Terminal"""
+    t : play with the Terminal
+    c : run a tournament of games between two computer players (default 1000 games between Knuths)"""
     )
     quit()
 
 
 if __name__ == "__main__":
-    if len(argv) != 2:
+    if len(argv) < 2 or (argv[1] != "c" and len(argv) != 2) or len(argv) > 6:
         usage()
     if argv[1] == "t":
         ui = Terminal()
@@ -28,5 +31,24 @@ if __name__ == "__main__":
         timer = QTimer()
         timer.singleShot(100, ui.run)
         app.exec()
+    elif argv[1] == "c":
+        if not all(arg.isdigit() for arg in argv[2:4]):
+            usage()
+        algorithmTypes = [getattr(alg, name, None) for name in argv[4:6]]
+        if not all(
+            isinstance(algorithmType, type) and issubclass(algorithmType, alg.Algorithm)
+            for algorithmType in algorithmTypes
+        ):
+            usage()
+        algorithmTypes += [alg.Knuths] * (2 - len(algorithmTypes))
+        tournament = Tournament(
+            algorithmTypes[0],
+            algorithmTypes[1],
+            numGames=int(argv[2]) if len(argv) > 2 else 1000,
+            workers=int(argv[3]) if len(argv) > 3 else None,
+            dataBase=UI.DATABASE,
+        )
+        tournament.run()
+        print(tournament)
     else:
         usage()
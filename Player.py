@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import selectors
 from abc import ABC, abstractmethod
 from random import choice, sample
+from time import perf_counter, process_time
 
 from PyQt6 import QtCore as qtc
 from PyQt6 import QtWidgets as qtw
 
 import Algorithms as alg
+import Instrumentation
 from Board import Board
+from Broadcaster import Broadcaster
 from DataBaseManager import Statistics
+from Feedback import decodeCode
 from PyQtPlayerUI import SignalsGUI, gameWidget, loopSpinner
 from Sockets import MessageExchangeError, NoMessageError, SocketManager
 
@@ -89,17 +94,33 @@ class Computer(Player):
     Computer class that inherits from the Player class
     """
 
-    def __init__(self, stats: Statistics, algorithmType: alg.Algorithm):
+    def __init__(
+        self,
+        stats: Statistics,
+        algorithmType: alg.Algorithm,
+        timeBudget: float | None = None,
+    ):
         super().__init__(stats)
         self.__board = None
         self.__algorithmType = algorithmType
         self.__algorithm = None
+        # the time in seconds the algorithm can take for each move, if it supports one
+        self.__timeBudget = timeBudget
 
     def __genAlgorithm(self, length: int, colourNum: int, duplicatesAllowed: bool):
         """
         Generates an instance of the algorithm for the AI to use.
         """
-        self.__algorithm = self.__algorithmType(length, colourNum, duplicatesAllowed)
+        if self.__timeBudget is not None and issubclass(
+            self.__algorithmType, (alg.RandomConsistent, alg.DecisionTree)
+        ):
+            self.__algorithm = self.__algorithmType(
+                length, colourNum, duplicatesAllowed, timeBudget=self.__timeBudget
+            )
+        else:
+            self.__algorithm = self.__algorithmType(
+                length, colourNum, duplicatesAllowed
+            )
 
     def getMove(self, board: Board) -> list[int]:
         """
@@ -110,7 +131,22 @@ class Computer(Player):
         duplicatesAllowed = board.getDuplicatesAllowed()
         if self.__algorithm == None:
             self.__genAlgorithm(length, colourNum, duplicatesAllowed)
-        return self.__algorithm.getNextGuess(self.__getPreviousResponse())
+        scoringCalls = self.__algorithm.getScoringCalls()
+        startTime, startCpuTime = perf_counter(), process_time()
+        guess = self.__algorithm.getNextGuess(self.__getPreviousResponse())
+        if Instrumentation.isSubscribed():
+            Instrumentation.emit(
+                Instrumentation.SolverEvent(
+                    self.getUsername(),
+                    self.__algorithmType.__name__,
+                    len(board.getEncodedGuesses()) + 1,
+                    perf_counter() - startTime,
+                    process_time() - startCpuTime,
+                    self.__algorithm.getConsistentSetSize(),
+                    self.__algorithm.getScoringCalls() - scoringCalls,
+                )
+            )
+        return decodeCode(guess, length, colourNum)
 
     def getCode(self, board: Board) -> list[int]:
         """
@@ -148,12 +184,12 @@ class Computer(Player):
         """
         pass
 
-    def __getPreviousResponse(self) -> list:
+    def __getPreviousResponse(self) -> int | None:
         """
-        Returns the previous response from the board. If there is no board, it returns None.
+        Returns the previous encoded response from the board. If there is no board, it returns None.
         """
         if self.__board:
-            return self.__board.getResults()[-1]
+            return self.__board.getEncodedResults()[-1]
         return None
 
 
@@ -484,6 +520,9 @@ class GUI(Player):
     def show(self):
         self.__mainWindow.showMaximized()
 
+    def hide(self):
+        self.__mainWindow.hide()
+
     def initUI(self):
         """
         Initialises the GUI
@@ -506,64 +545,145 @@ class serverPlayer(Player, SocketManager):
     It will send messages to the client asking it for input
     It will not render anything
     It will be used as a player in the game
+    It starts listening when it is created, but only waits for the client in waitForClient,
+    so that the wait can be done off the GUI thread
+    If a broadcaster is given, everything displayed to the client is also sent to its spectators,
+    and the broadcaster is closed when the game is over, or if the client never connects
     """
 
-    def __init__(self, host: str, port: int, stats: Statistics):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        stats: Statistics,
+        broadcaster: Broadcaster | None = None,
+    ):
         Player.__init__(self, stats)
         SocketManager.__init__(self, host, port)
-        self.socket = self._createServerSocket()
+        self.__broadcaster = broadcaster
+        self.__connected = False
+        try:
+            self.__listener = self._createListeningSocket()
+        except OSError:
+            ######################
+            # EXCEPTION HANDLING #
+            ######################
+            self.stopBroadcasting()
+            raise
+
+    def waitForClient(self):
+        """
+        Waits for the client to connect, which blocks so should not be called on the GUI thread.
+        If the client does not connect before the socket times out, the error is raised.
+        """
+        try:
+            self.socket = self._acceptClient(self.__listener)
+        except OSError:
+            ######################
+            # EXCEPTION HANDLING #
+            ######################
+            self.stopBroadcasting()
+            raise
+        self.__connected = True
+
+    def isConnected(self) -> bool:
+        return self.__connected
+
+    def __sendToAll(self, msg: SocketManager.possibleMessages, *args):
+        """
+        Sends the message to the client and any spectators.
+        """
+        self.sendMessage(msg, *args)
+        if self.__broadcaster is not None:
+            self.__broadcaster.broadcast(msg, *args)
+
+    def stopBroadcasting(self):
+        """
+        Disconnects any spectators and closes the broadcaster.
+        """
+        if self.__broadcaster is not None:
+            self.__broadcaster.broadcast(self.possibleMessages.DISCONNECT)
+            self.__broadcaster.close()
+            self.__broadcaster = None
+
+    def __request(
+        self,
+        msg: SocketManager.possibleMessages,
+        expected: SocketManager.possibleMessages,
+        board: Board,
+    ) -> list[int]:
+        """
+        Sends a message with the board and waits for the expected reply,
+        which must be a code of the right length.
+        """
+        self.sendMessage(msg, board)
+        reply, returnData = self.receiveMessage(timeout=False)
+        if reply != expected or len(returnData) != 1:
+            raise MessageExchangeError("Did not receive expected message")
+        code = returnData[0]
+        # the wire format allows other types, which would only fail later when the board uses them
+        if not isinstance(code, list) or len(code) != board.getLenOfGuess():
+            raise MessageExchangeError(f"Invalid code: {code}")
+        return code
 
     def getMove(self, board: Board) -> list[int]:
         """
         Returns the players next guess.
         """
-        self.sendMessage(self.possibleMessages.GET_MOVE, board)
-        msg, returnData = self.receiveMessage(timeout=False)
-        if msg != self.possibleMessages.RETURN_MOVE:
-            raise MessageExchangeError("Did not receive expected message")
-        return returnData[0]
+        return self.__request(
+            self.possibleMessages.GET_MOVE, self.possibleMessages.RETURN_MOVE, board
+        )
 
     def getCode(self, board: Board) -> list[int]:
         """
         Returns the players code.
         """
-        self.sendMessage(self.possibleMessages.GET_CODE, board)
-        msg, returnData = self.receiveMessage(timeout=False)
-        if msg != self.possibleMessages.RETURN_CODE:
-            raise MessageExchangeError("Did not receive expected message")
-        return returnData[0]
+        return self.__request(
+            self.possibleMessages.GET_CODE, self.possibleMessages.RETURN_CODE, board
+        )
 
     def displayBoard(self, board: Board, code: list = None):
         """
         Displays the board to the player.
         """
-        self.sendMessage(self.possibleMessages.DISPLAY_BOARD, board, code)
+        self.__sendToAll(self.possibleMessages.DISPLAY_BOARD, board, code)
 
     def displayRoundWinner(self, winner: str):
         """
         Displays the winner of the round.
         """
-        self.sendMessage(self.possibleMessages.DISPLAY_ROUND_WINNER, winner)
+        self.__sendToAll(self.possibleMessages.DISPLAY_ROUND_WINNER, winner)
 
     def displayWinner(self, winner: str | None):
         """
         Displays the winner of the game.
         """
-        self.sendMessage(self.possibleMessages.DISPLAY_WINNER, winner)
+        self.__sendToAll(self.possibleMessages.DISPLAY_WINNER, winner)
+        # the game is over, so the spectator port is freed for the next game
+        self.stopBroadcasting()
 
     def displayRoundNumber(self, roundNumber: int):
         """
         Displays the round number.
         """
-        self.sendMessage(self.possibleMessages.DISPLAY_ROUND_NUMBER, roundNumber)
+        self.__sendToAll(self.possibleMessages.DISPLAY_ROUND_NUMBER, roundNumber)
 
     def disconnect(self):
         """
-        Disconnects the client and closes the socket.
+        Disconnects the client and any spectators, and closes the socket.
         """
-        self.sendMessage(self.possibleMessages.DISCONNECT)
+        self.stopBroadcasting()
+        if self.__connected:
+            self.sendMessage(self.possibleMessages.DISCONNECT)
         self.close()
 
+    def close(self):
+        """
+        Closes the socket, and stops listening if the client never connected.
+        """
+        self.__listener.close()
+        super().close()
+
     def __del__(self):
         try:
             self.disconnect()
@@ -584,34 +704,52 @@ class clientPlayer(GUI, SocketManager):
         SocketManager.__init__(self, host, port)
         self.socket = self._createClientSocket()
 
-    def playGame(self):
-        while True:
-            try:
-                msg, data = self.receiveMessage()
-            except NoMessageError:
-                ######################
-                # EXCEPTION HANDLING #
-                ######################
-                continue
-            if msg == self.possibleMessages.GET_MOVE:
-                move = self.getMove(data[0])
-                self.sendMessage(self.possibleMessages.RETURN_MOVE, move)
-            elif msg == self.possibleMessages.GET_CODE:
-                code = self.getCode(data[0])
-                self.sendMessage(self.possibleMessages.RETURN_CODE, code)
-            elif msg == self.possibleMessages.DISPLAY_BOARD:
-                self.displayBoard(data[0], data[1])
-            elif msg == self.possibleMessages.DISPLAY_ROUND_WINNER:
-                self.displayRoundWinner(data[0])
-            elif msg == self.possibleMessages.DISPLAY_WINNER:
-                self.displayWinner(data[0])
-                # game over
-                return True
-            elif msg == self.possibleMessages.DISPLAY_ROUND_NUMBER:
-                self.displayRoundNumber(data[0])
-            elif msg == self.possibleMessages.DISCONNECT:
-                self.close()
-            elif msg == self.possibleMessages.CONFIRM:
-                raise MessageExchangeError("Nothing to confirm")
-            else:
-                raise MessageExchangeError(f"Invalid message: {msg}")
+    def playGame(self) -> bool:
+        """
+        Plays the game with the server until it is over or the connection is closed.
+        The socket is only read once the selector says there is a message,
+        so it waits without using the CPU, and stops as soon as the server closes the connection.
+        Emits the gameFinished signal when it stops, so the GUI does not need to check on the thread.
+        Returns True if the game finished, or False if the connection was lost first.
+        """
+        finished = False
+        selector = selectors.DefaultSelector()
+        selector.register(self.socket, selectors.EVENT_READ)
+        try:
+            while not finished:
+                selector.select()
+                try:
+                    msg, data = self.receiveMessage(timeout=False)
+                except (NoMessageError, OSError):
+                    ######################
+                    # EXCEPTION HANDLING #
+                    ######################
+                    # the server has closed the connection
+                    break
+                if msg == self.possibleMessages.GET_MOVE:
+                    move = self.getMove(data[0])
+                    self.sendMessage(self.possibleMessages.RETURN_MOVE, move)
+                elif msg == self.possibleMessages.GET_CODE:
+                    code = self.getCode(data[0])
+                    self.sendMessage(self.possibleMessages.RETURN_CODE, code)
+                elif msg == self.possibleMessages.DISPLAY_BOARD:
+                    self.displayBoard(data[0], data[1])
+                elif msg == self.possibleMessages.DISPLAY_ROUND_WINNER:
+                    self.displayRoundWinner(data[0])
+                elif msg == self.possibleMessages.DISPLAY_WINNER:
+                    self.displayWinner(data[0])
+                    # game over
+                    finished = True
+                elif msg == self.possibleMessages.DISPLAY_ROUND_NUMBER:
+                    self.displayRoundNumber(data[0])
+                elif msg == self.possibleMessages.DISCONNECT:
+                    break
+                elif msg == self.possibleMessages.CONFIRM:
+                    raise MessageExchangeError("Nothing to confirm")
+                else:
+                    raise MessageExchangeError(f"Invalid message: {msg}")
+        finally:
+            selector.close()
+            self.close()
+            self.signals.gameFinished.emit(finished)
+        return finished
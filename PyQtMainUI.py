@@ -133,10 +133,14 @@ class LoginPage(qtw.QWidget):
 
 
 class OnlineMultiplayerPage(qtw.QWidget):
-    def __init__(self, textForConfirmButton: str):
+    def __init__(self, textForConfirmButton: str, spectatorPortOffset: int = None):
+        """
+        If spectatorPortOffset is given, the port spectators can join on is shown under the port
+        """
         super().__init__()
         self.hostText = ""
         self.portText = ""
+        self.spectatorPortOffset = spectatorPortOffset
         self.setLayout(qtw.QVBoxLayout())
         self.hostEnter = qtw.QLineEdit()
         self.hostEnter.setFixedWidth(250)
@@ -156,6 +160,10 @@ class OnlineMultiplayerPage(qtw.QWidget):
             lambda t=self.portEnter.text(): self.__updatePortText(t)
         )
         self.layout().addWidget(self.portEnter)
+        self.spectatorPortLabel = qtw.QLabel()
+        self.spectatorPortLabel.setFont(qtg.QFont("Times", 14))
+        self.spectatorPortLabel.setVisible(spectatorPortOffset is not None)
+        self.layout().addWidget(self.spectatorPortLabel)
         self.confirmButton = qtw.QPushButton(textForConfirmButton)
         self.confirmButton.setFixedWidth(250)
         self.confirmButton.setFixedHeight(50)
@@ -172,6 +180,13 @@ class OnlineMultiplayerPage(qtw.QWidget):
 
     def __updatePortText(self, text: str):
         self.portText = text
+        if self.spectatorPortOffset is not None:
+            if text.isdigit():
+                self.spectatorPortLabel.setText(
+                    f"Spectators join on port {int(text) + self.spectatorPortOffset}"
+                )
+            else:
+                self.spectatorPortLabel.setText("")
 
     def getHost(self) -> str:
         return self.hostText
@@ -286,6 +286,8 @@ class SignalsGUI(qtc.QObject):
     displayBoard = qtc.pyqtSignal(object, object)
     displayRoundWinner = qtc.pyqtSignal(object)
     displayWinner = qtc.pyqtSignal(object)
+    # emitted by a clientPlayer when its game ends, with True if the game finished
+    gameFinished = qtc.pyqtSignal(bool)
 
 
 class loopSpinner(qtc.QEventLoop):
@@ -0,0 +1,202 @@
+import random
+import tracemalloc
+from dataclasses import dataclass, field
+from sys import argv
+from time import perf_counter
+
+import Algorithms as alg
+from Board import Board
+from Feedback import decodeCode, genCodeArray, getNumberOfCodes
+
+
+@dataclass
+class SimulationResult:
+    """
+    The results of playing an algorithm against many codes
+    """
+
+    algorithm: str
+    lengthOfCode: int
+    colourNum: int
+    duplicatesAllowed: bool
+    games: int = 0
+    # the number of games that were not solved within the maximum number of guesses
+    unsolved: int = 0
+    # the number of solved games that took each number of guesses
+    guessDistribution: dict[int, int] = field(default_factory=dict)
+    moves: int = 0
+    moveTime: float = 0.0
+    # the peak memory allocated while playing, in bytes
+    peakMemory: int = 0
+
+    def getWorstCase(self) -> int:
+        return max(self.guessDistribution, default=0)
+
+    def getMeanGuesses(self) -> float:
+        solved = sum(self.guessDistribution.values())
+        if solved == 0:
+            return 0.0
+        total = sum(guesses * n for guesses, n in self.guessDistribution.items())
+        return total / solved
+
+    def getMeanMoveTime(self) -> float:
+        return self.moveTime / self.moves if self.moves else 0.0
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.algorithm} on {self.lengthOfCode} pegs, {self.colourNum} colours, "
+            f"duplicates {'allowed' if self.duplicatesAllowed else 'not allowed'}",
+            f"Games: {self.games} ({self.unsolved} unsolved)",
+            f"Mean guesses: {self.getMeanGuesses():.3f}",
+            f"Worst case: {self.getWorstCase()}",
+            f"Mean time per move: {self.getMeanMoveTime() * 1000:.3f}ms",
+            f"Peak memory: {self.peakMemory / 1024 ** 2:.2f}MB",
+            "Guesses to solve:",
+        ]
+        for guesses in sorted(self.guessDistribution):
+            lines.append(f"    {guesses}: {self.guessDistribution[guesses]}")
+        return "\n".join(lines)
+
+
+class Simulator:
+    """
+    Plays an algorithm against every possible code, or a random sample of them, without any display.
+    Each game is scored by a Board, in the same way as in a real game.
+    """
+
+    def __init__(
+        self,
+        algorithmType: type[alg.Algorithm],
+        lengthOfCode: int = 4,
+        colourNum: int = 6,
+        duplicatesAllowed: bool = True,
+        maxGuesses: int = 1000,
+    ):
+        self.__algorithmType = algorithmType
+        self.__lengthOfCode = lengthOfCode
+        self.__colourNum = colourNum
+        self.__duplicatesAllowed = duplicatesAllowed
+        self.__maxGuesses = maxGuesses
+
+    def genCodes(self, sampleSize: int | None = None, seed: int | None = None):
+        """
+        Returns a generator of the codes to play against.
+        If sampleSize is None, or there are not that many codes, every code is returned.
+        Otherwise, sampleSize random codes are returned.
+        """
+        numberOfCodes = getNumberOfCodes(
+            self.__lengthOfCode, self.__colourNum, self.__duplicatesAllowed
+        )
+        if sampleSize is None or sampleSize >= numberOfCodes:
+            for code in genCodeArray(
+                self.__lengthOfCode, self.__colourNum, self.__duplicatesAllowed
+            ):
+                yield [int(colour) for colour in code]
+            return
+        rng = random.Random(seed)
+        colours = [i for i in range(1, self.__colourNum + 1)]
+        for _ in range(sampleSize):
+            if self.__duplicatesAllowed:
+                yield [rng.choice(colours) for _ in range(self.__lengthOfCode)]
+            else:
+                yield rng.sample(colours, self.__lengthOfCode)
+
+    def playGame(self, code: list[int]) -> tuple[int | None, list[float]]:
+        """
+        Plays the algorithm against the code.
+        Returns a tuple of the number of guesses taken, or None if the code was not solved,
+        and a list of the time taken to make each move.
+        """
+        board = Board(
+            length=self.__lengthOfCode,
+            totalGuesses=self.__maxGuesses,
+            duplicatesAllowed=self.__duplicatesAllowed,
+            colourNum=self.__colourNum,
+        )
+        board.setCode(code)
+        algorithm = self.__algorithmType(
+            self.__lengthOfCode, self.__colourNum, self.__duplicatesAllowed
+        )
+        moveTimes = []
+        previousResponse = None
+        while True:
+            startTime = perf_counter()
+            guess = algorithm.getNextGuess(previousResponse)
+            moveTimes.append(perf_counter() - startTime)
+            _, remainingGuesses, codeCorrect = board.makeGuess(
+                decodeCode(guess, self.__lengthOfCode, self.__colourNum)
+            )
+            if codeCorrect:
+                return len(moveTimes), moveTimes
+            if remainingGuesses == 0:
+                return None, moveTimes
+            previousResponse = board.getEncodedResults()[-1]
+
+    def run(
+        self,
+        sampleSize: int | None = None,
+        seed: int | None = None,
+        traceMemory: bool = True,
+    ) -> SimulationResult:
+        """
+        Plays the algorithm against every code from genCodes and returns the results.
+        If traceMemory is True, the peak memory is measured, which makes each move slower.
+        """
+        result = SimulationResult(
+            self.__algorithmType.__name__,
+            self.__lengthOfCode,
+            self.__colourNum,
+            self.__duplicatesAllowed,
+        )
+        if traceMemory:
+            tracemalloc.start()
+        try:
+            for code in self.genCodes(sampleSize, seed):
+                guesses, moveTimes = self.playGame(code)
+                result.games += 1
+                result.moves += len(moveTimes)
+                result.moveTime += sum(moveTimes)
+                if guesses is None:
+                    result.unsolved += 1
+                else:
+                    result.guessDistribution[guesses] = (
+                        result.guessDistribution.get(guesses, 0) + 1
+                    )
+            if traceMemory:
+                result.peakMemory = tracemalloc.get_traced_memory()[1]
+        finally:
+            if traceMemory:
+                tracemalloc.stop()
+        return result
+
+
+def usage():
+    print(
+        f"""
+    Usage: {argv[0]} <algorithm> [length] [colourNum] [duplicatesAllowed] [sampleSize]
+    algorithm         : the name of the algorithm, e.g. Knuths
+    length            : the length of the code (default 4)
+    colourNum         : the number of colours (default 6)
+    duplicatesAllowed : y or n (default y)
+    sampleSize        : the number of random codes to play against (default every code)"""
+    )
+    quit()
+
+
+if __name__ == "__main__":
+    if not 2 <= len(argv) <= 6:
+        usage()
+    algorithmType = getattr(alg, argv[1], None)
+    if not (
+        isinstance(algorithmType, type) and issubclass(algorithmType, alg.Algorithm)
+    ):
+        usage()
+    try:
+        length = int(argv[2]) if len(argv) > 2 else 4
+        colourNum = int(argv[3]) if len(argv) > 3 else 6
+        sampleSize = int(argv[5]) if len(argv) > 5 else None
+    except ValueError:
+        usage()
+    duplicatesAllowed = argv[4] != "n" if len(argv) > 4 else True
+    simulator = Simulator(algorithmType, length, colourNum, duplicatesAllowed)
+    print(simulator.run(sampleSize))
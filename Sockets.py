@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import pickle
 import socket
+import struct
 from abc import ABC
 from enum import Enum
 
+from WireFormat import WireFormat, WireFormatError
+
 
 #####################
 # CUSTOM EXCEPTIONS #
@@ -33,9 +35,24 @@ class SocketManager(ABC):
     ##############################################
     # GROUP A SKILL: COMPLEX CLIENT-SERVER MODEL #
     ##############################################
-    def __init__(self, host: str, port: int):
+    # the header at the start of every frame, which is the length of the rest of the frame
+    FRAME_HEADER = struct.Struct("!I")
+    # the largest frame that will be received, so a bad header cannot make it wait for gigabytes
+    MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, host: str, port: int, ackInterval: int = 0):
+        """
+        If ackInterval is more than 0, a confirmation message is sent back after every ackInterval messages,
+        and both ends must use the same ackInterval.
+        If it is 0, messages are not confirmed, which is safe as TCP already delivers them in order.
+        """
         self.host = host
         self.port = port
+        self.ackInterval = ackInterval
+        self.__unconfirmedSent = 0
+        self.__unconfirmedReceived = 0
+        # the data in each message is encoded with a wire format that remembers what has been sent
+        self.__wireFormat = WireFormat()
         self.socket: socket.socket = self.__createUnboundSocket()
         # socket attribute should be set by the subclass
 
@@ -45,15 +62,28 @@ class SocketManager(ABC):
         s.settimeout(20)
         return s
 
-    def _createServerSocket(self) -> socket.socket:
+    def _createListeningSocket(self) -> socket.socket:
+        """
+        Returns a socket listening on the host and port, without waiting for a client.
+        """
         s = self.__createUnboundSocket()
+        # allow the port to be used again straight after the last game on it
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         # Bind to the address
         s.bind((self.host, self.port))
         s.listen(1)
-        # wait for client connection.
-        conn, addr = s.accept()
-        # close the listening socket
-        s.close()
+        return s
+
+    def _acceptClient(self, listener: socket.socket) -> socket.socket:
+        """
+        Waits for a client to connect to the listening socket, then closes it.
+        """
+        try:
+            # wait for client connection.
+            conn, addr = listener.accept()
+        finally:
+            # close the listening socket
+            listener.close()
         # return the client connection socket
         return conn
 
@@ -69,98 +99,139 @@ class SocketManager(ABC):
         """
         self.socket.sendall(msg)
 
-    def __receiveData(self) -> bytes:
+    def __receiveData(self, size: int) -> bytes:
         """
-        Receives a message from the socket.
+        Receives exactly size bytes from the socket.
+        recv can return less than was asked for, so it is called until all of the bytes have arrived.
+        Raises NoMessageError if the socket is closed before any bytes are received.
         """
-        return self.socket.recv(2048)
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.socket.recv(size - len(data))
+            if not chunk:
+                if not data:
+                    raise NoMessageError("No message received")
+                raise MessageExchangeError(
+                    "Connection closed part way through a message"
+                )
+            data += chunk
+        return bytes(data)
 
-    def __sendMessage(self, msg: bytes):
+    @classmethod
+    def encodeFrame(cls, msg: possibleMessages, encodedData: bytes) -> bytes:
+        """
+        Returns a message as a frame, in the form of:
+        <length of body as a 4 byte unsigned integer><message type><delimiter><encoded data>
+        """
+        body = (msg.value + cls.possibleMessages.DELIMITER.value).encode() + encodedData
+        return cls.FRAME_HEADER.pack(len(body)) + body
+
+    @classmethod
+    def getFrameSize(cls, header: bytes) -> int:
+        """
+        Returns the length of the body of a frame from its header.
+        """
+        (size,) = cls.FRAME_HEADER.unpack(header)
+        if size > cls.MAX_FRAME_SIZE:
+            raise MessageExchangeError(f"Message too large: {size} bytes")
+        return size
+
+    @classmethod
+    def decodeFrame(cls, body: bytes) -> tuple[possibleMessages, bytes]:
+        """
+        Splits the body of a frame into the message type and the encoded data.
+        """
+        msgType, _, data = body.partition(cls.possibleMessages.DELIMITER.value.encode())
+        try:
+            return cls.possibleMessages(msgType.decode()), data
+        except ValueError as e:
+            raise MessageExchangeError(f"Could not decode message: {e}")
+
+    def __sendFrame(self, body: bytes):
+        """
+        Sends a frame to the socket.
+        A frame is in the form of:
+        <length of body as a 4 byte unsigned integer><body>
+        """
+        self.__send(self.FRAME_HEADER.pack(len(body)) + body)
+
+    def __receiveFrame(self) -> bytes:
+        """
+        Receives a frame from the socket and returns its body.
+        """
+        size = self.getFrameSize(self.__receiveData(self.FRAME_HEADER.size))
+        return self.__receiveData(size)
+
+    def __waitForConfirmation(self):
         """
-        Sends a message to the socket.
         Waits for a confirmation message from the socket.
         Sets the timeout to be 5 seconds while waiting for the confirmation message.
         """
-        # send the message
-        self.__send(msg)
         # change the timeout to 5 seconds
         timeout = self.socket.gettimeout()
         self.socket.settimeout(5)
         try:
             # wait for the confirmation message
-            c = self.__receiveData()
+            c = self.__receiveFrame()
         finally:
             # reset the timeout
             self.socket.settimeout(timeout)
         # if the confirmation message is not the expected one, raise an exception
-        if not c or c.decode() != self.possibleMessages.CONFIRM.value:
+        if c.decode() != self.possibleMessages.CONFIRM.value:
             raise MessageExchangeError("Did not receive confirmation")
 
-    def __receiveMessage(self) -> bytes:
-        """
-        Receives a message from the socket.
-        Sends a confirmation message to the socket.
-        """
-        msg = self.__receiveData()
-        if not msg:
-            raise NoMessageError("No message received")
-        # send the confirmation message
-        self.__send(self.possibleMessages.CONFIRM.value.encode())
-        return msg
-
     def sendMessage(self, msg: possibleMessages, *args):
         """
         Sends data to the socket.
-        The data is pickled and then sent.
-        The primary message will be in the form of:
-        <message type><delimiter><no. of subsequent messages>
-        It will then wait for a confirmation message.
-        Any subsequent messages will be in the form of:
-        <pickled data>
-        Finally, it should receive a confirmation message.
+        The message type and all of the data are sent in a single frame, with a body in the form of:
+        <message type><delimiter><encoded data>
+        If ackInterval is set, it waits for a confirmation message after every ackInterval messages.
         """
         ##################################################
         # GROUP A SKILL: COMPLEX USER DEFINED ALGORITHMS #
         ##################################################
-        primaryMsg = msg.value + self.possibleMessages.DELIMITER.value + str(len(args))
-        # send the primary message
-        self.__sendMessage(primaryMsg.encode())
-        # send the subsequent messages
-        for arg in args:
-            self.__sendMessage(self.__pickleData(arg))
+        try:
+            encodedData = self.__wireFormat.encode(list(args))
+        except WireFormatError as e:
+            raise MessageExchangeError(f"Could not encode message: {e}")
+        self.__send(self.encodeFrame(msg, encodedData))
+        if self.ackInterval:
+            self.__unconfirmedSent += 1
+            if self.__unconfirmedSent == self.ackInterval:
+                self.__unconfirmedSent = 0
+                self.__waitForConfirmation()
 
     def receiveMessage(self, timeout: bool = True) -> tuple[possibleMessages, list]:
         """
         Receives a message from the socket.
-        Sends a confirmation message.
-        Splits it according to the delimiter.
-        The message should be in the form of:
-        <message type><delimiter><no. of subsequent messages>
-        It then receives the subsequent pickled data.
+        The message type and the data are received in a single frame, with a body in the form of:
+        <message type><delimiter><encoded data>
+        If ackInterval is set, it sends a confirmation message after every ackInterval messages.
         It returns a tuple of the message type and the list of data.
         """
         ##################################################
         # GROUP A SKILL: COMPLEX USER DEFINED ALGORITHMS #
         ##################################################
         # if we do not want the socket to timeout, we set the timeout to None
+        oldTimeout = self.socket.gettimeout()
         if not timeout:
-            oldTimeout = self.socket.gettimeout()
             self.socket.settimeout(None)
-        # receive the primary msg
-        primaryMsg = self.__receiveMessage()
-        # split the primary msg into the message type and the number of subsequent messages
-        msg, numData = self.splitData(primaryMsg.decode())
-        encData = []
-        # receive the subsequent data
-        for _ in range(int(numData[0])):
-            d = self.__receiveMessage()
-            encData.append(d)
-        # unpickle the data
-        data = [self.__unpickleData(d) for d in encData]
-        if not timeout:
+        try:
+            body = self.__receiveFrame()
+        finally:
             # set the timeout back to the old value
             self.socket.settimeout(oldTimeout)
-        return msg, data
+        if self.ackInterval:
+            self.__unconfirmedReceived += 1
+            if self.__unconfirmedReceived == self.ackInterval:
+                self.__unconfirmedReceived = 0
+                self.__sendFrame(self.possibleMessages.CONFIRM.value.encode())
+        # split the body into the message type and the encoded data
+        msg, data = self.decodeFrame(body)
+        try:
+            return msg, self.__wireFormat.decode(data)
+        except WireFormatError as e:
+            raise MessageExchangeError(f"Could not decode message: {e}")
 
     def splitData(self, data: str) -> tuple[possibleMessages, list]:
         """
@@ -179,18 +250,6 @@ class SocketManager(ABC):
                 return member
         raise ValueError(f"Invalid Enum: {msg}")
 
-    def __pickleData(self, data) -> bytes:
-        """
-        Pickles the data and returns it as bytes
-        """
-        return pickle.dumps(data)
-
-    def __unpickleData(self, data: bytes):
-        """
-        Unpickles the data and returns it
-        """
-        return pickle.loads(data)
-
     def close(self):
         """
         Closes the socket.
@@ -0,0 +1,167 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import cpu_count
+from time import perf_counter
+
+import Algorithms as alg
+import Player as pl
+from DataBaseManager import Statistics, dataBaseManager
+from Game import Game
+
+
+def _playGames(
+    usernames: tuple[str, str],
+    algorithmTypes: tuple[type[alg.Algorithm], type[alg.Algorithm]],
+    numGames: int,
+    gameSettings: tuple[int, int, int, bool, int],
+) -> tuple[list[Statistics], list[tuple]]:
+    """
+    Plays numGames games between two computer players in a worker process.
+    Returns a tuple of the statistics of both players and a list of the past games,
+    where each past game is a tuple of the arguments to dataBaseManager.savePastGame.
+    """
+    length, numGuesses, numRounds, duplicatesAllowed, colourNum = gameSettings
+    player1 = pl.Computer(Statistics(usernames[0]), algorithmTypes[0])
+    player2 = pl.Computer(Statistics(usernames[1]), algorithmTypes[1])
+    pastGames = []
+    for _ in range(numGames):
+        game = Game(
+            player1,
+            player2,
+            length,
+            numGuesses,
+            numRounds,
+            duplicatesAllowed,
+            colourNum,
+        )
+        timeTaken, _ = game.run()
+        winner = game.getWinner()
+        pastGames.append(
+            (
+                usernames[0],
+                usernames[1],
+                winner.getUsername() if winner is not None else None,
+                length,
+                numGuesses,
+                numRounds,
+                colourNum,
+                duplicatesAllowed,
+                timeTaken,
+                Tournament.MODE,
+            )
+        )
+    return [player1.getStats(), player2.getStats()], pastGames
+
+
+class Tournament:
+    """
+    Plays many games between two computer players, spread across a pool of worker processes.
+    The results from each worker are collected as they finish,
+    and are written to the database in bulk once every game has been played.
+    """
+
+    # the mode the past games are saved with
+    MODE = "TOURNAMENT"
+    # the number of games played by a worker before it sends its results back
+    GAMES_PER_BATCH = 50
+
+    def __init__(
+        self,
+        algorithmType1: type[alg.Algorithm],
+        algorithmType2: type[alg.Algorithm],
+        numGames: int = 1000,
+        workers: int | None = None,
+        length: int = 4,
+        numGuesses: int = 6,
+        numRounds: int = 3,
+        duplicatesAllowed: bool = True,
+        colourNum: int = 6,
+        dataBase: str | None = None,
+    ):
+        self.__algorithmTypes = (algorithmType1, algorithmType2)
+        self.__usernames = (
+            f"Computer 1 ({algorithmType1.__name__})",
+            f"Computer 2 ({algorithmType2.__name__})",
+        )
+        self.__numGames = numGames
+        self.__workers = workers if workers is not None else cpu_count() or 1
+        self.__gameSettings = (
+            length,
+            numGuesses,
+            numRounds,
+            duplicatesAllowed,
+            colourNum,
+        )
+        self.__dataBase = dataBase
+        self.__stats = [Statistics(username) for username in self.__usernames]
+        self.__pastGames = []
+        self.__timeTaken = 0.0
+
+    def getStats(self) -> list[Statistics]:
+        return self.__stats
+
+    def getPastGames(self) -> list[tuple]:
+        return self.__pastGames
+
+    def getTimeTaken(self) -> float:
+        return self.__timeTaken
+
+    def getGamesPerSecond(self) -> float:
+        if self.__timeTaken == 0:
+            return 0.0
+        return len(self.__pastGames) / self.__timeTaken
+
+    def run(self, progress: bool = True):
+        """
+        Plays all of the games, then saves the results to the database if one was given.
+        If progress is True, the number of games played is printed as the results arrive.
+        """
+        startTime = perf_counter()
+        batches = [
+            min(self.GAMES_PER_BATCH, self.__numGames - i)
+            for i in range(0, self.__numGames, self.GAMES_PER_BATCH)
+        ]
+        with ProcessPoolExecutor(self.__workers) as executor:
+            futures = [
+                executor.submit(
+                    _playGames,
+                    self.__usernames,
+                    self.__algorithmTypes,
+                    numGames,
+                    self.__gameSettings,
+                )
+                for numGames in batches
+            ]
+            for future in as_completed(futures):
+                stats, pastGames = future.result()
+                self.__collect(stats, pastGames)
+                if progress:
+                    print(f"Played {len(self.__pastGames)}/{self.__numGames} games")
+        self.__timeTaken = perf_counter() - startTime
+        if self.__dataBase is not None:
+            dbm = dataBaseManager(self.__dataBase)
+            dbm.addToStatsTables(self.__stats)
+            dbm.savePastGames(self.__pastGames)
+
+    def __collect(self, stats: list[Statistics], pastGames: list[tuple]):
+        """
+        Adds the results from a worker to the totals
+        """
+        for total, batch in zip(self.__stats, stats):
+            total.wins += batch.wins
+            total.losses += batch.losses
+            total.draws += batch.draws
+            total.totalGames += batch.totalGames
+            total.roundsPlayed += batch.roundsPlayed
+            total.timePlayed += batch.timePlayed
+        self.__pastGames += pastGames
+
+    def __str__(self) -> str:
+        lines = [
+            f"Played {len(self.__pastGames)} games with {self.__workers} workers "
+            f"in {self.__timeTaken:.2f}s ({self.getGamesPerSecond():.1f} games/sec)"
+        ]
+        for stats in self.__stats:
+            lines.append(
+                f"{stats.username}: {stats.wins} wins, {stats.losses} losses, {stats.draws} draws"
+            )
+        return "\n".join(lines)
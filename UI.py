@@ -9,6 +9,7 @@ from PyQt6.QtCore import QCoreApplication, QTimer
 import Algorithms as alg
 import Player as pl
 import PyQtMainUI as qtui
+from Broadcaster import Broadcaster
 from DataBaseManager import Statistics, dataBaseManager
 from Game import Game
 
@@ -35,9 +36,17 @@ class UI(ABC):
         1: alg.Random,
         2: alg.RandomConsistent,
         3: alg.Knuths,
+        4: alg.DecisionTree,
+        5: alg.ExpectedSize,
+        6: alg.Entropy,
+        7: alg.MostParts,
     }
 
     DATABASE = "users.db"
+    # the time in seconds the computer can take for each move in timed mode
+    TIMED_MOVE_BUDGET = 1.0
+    # spectators of a hosted game connect to the port after the game's port
+    SPECTATOR_PORT_OFFSET = 1
 
     def __init__(
         self,
@@ -129,7 +138,9 @@ class GUI(UI):
         )
         self.realAdvancedSetupPage = qtui.scrollArea(self.virtualAdvancedSetupPage)
         self.joinOnlineMultiplayerPage = qtui.OnlineMultiplayerPage("Join Game")
-        self.hostOnlineMultiplayerPage = qtui.OnlineMultiplayerPage("Host Game")
+        self.hostOnlineMultiplayerPage = qtui.OnlineMultiplayerPage(
+            "Host Game", self.SPECTATOR_PORT_OFFSET
+        )
         # Add all the pages to the main widget
         self.mainWidget.addWidget(self.loginPage)
         self.mainWidget.addWidget(self.welcomePage)
@@ -348,15 +359,29 @@ class GUI(UI):
         elif self._mode == qtui.gameModes.HOST_ONLINE_MULTIPLAYER:
             HOST = self.hostOnlineMultiplayerPage.getHost()
             PORT = int(self.hostOnlineMultiplayerPage.getPort())
+            # the last hosted game may not have finished, so its spectators are disconnected first
+            if type(getattr(self, "player2", None)) == pl.serverPlayer:
+                self.player2.stopBroadcasting()
+            try:
+                broadcaster = Broadcaster(HOST, PORT + self.SPECTATOR_PORT_OFFSET)
+            except OSError as e:
+                ######################
+                # EXCEPTION HANDLING #
+                ######################
+                # the game can still be played without spectators
+                broadcaster = None
+                self.showSpectatorError(PORT + self.SPECTATOR_PORT_OFFSET, e)
             self.player2 = pl.serverPlayer(
-                HOST, PORT, self._dbm.createEmptyStatsTable("Server")
+                HOST, PORT, self._dbm.createEmptyStatsTable("Server"), broadcaster
             )
         elif self._mode == qtui.gameModes.JOIN_ONLINE_MULTIPLAYER:
             pass
         elif self._mode == qtui.gameModes.TIMED:
             self.player1.setPopups(False)
             self.player2 = pl.Computer(
-                self._dbm.createEmptyStatsTable("Computer"), self._computerAlgorithmType
+                self._dbm.createEmptyStatsTable("Computer"),
+                self._computerAlgorithmType,
+                self.TIMED_MOVE_BUDGET,
             )
             length = 4
             numGuesses = 6
@@ -380,17 +405,29 @@ class GUI(UI):
 
     def joinGame(self, host: str, port: int):
         stats = self._dbm.createStatsTable(self.p1Username)
-        p1 = pl.clientPlayer(host, port, stats)
-        p1.show()
-        thread = ResultThread(target=p1.playGame)
+        self.client = pl.clientPlayer(host, port, stats)
+        self.client.show()
+        # the client tells the GUI when the game is over with a signal, rather than the GUI checking the thread
+        self.client.signals.gameFinished.connect(self.joinedGameOver)
+        thread = threading.Thread(target=self.client.playGame)
         thread.daemon = True
-        self.timer = QTimer()
-        self.timer.timeout.connect(lambda gameThread=thread: self.gameOver(gameThread))
         thread.start()
-        self.timer.start(1000)
         self.showWelcomePage()
         self.mainWindow.hide()
 
+    def joinedGameOver(self, finished: bool):
+        """
+        Called by the gameFinished signal when a game that was joined ends.
+        Tells the player if the connection was lost before the game finished.
+        """
+        self.mainWindow.show()
+        if not finished:
+            msgBox = qtw.QMessageBox()
+            msgBox.setWindowTitle("Disconnected")
+            msgBox.setText("The connection to the host was lost")
+            msgBox.setIcon(qtw.QMessageBox.Icon.Critical)
+            msgBox.exec()
+
     def startGame(self, game, timed: bool = False):
         """
         Starts the game
@@ -402,7 +439,10 @@ class GUI(UI):
             p1.show()
         if type(p2) == pl.GUI:
             p2.show()
-        thread = ResultThread(target=game.run)
+        if type(p2) == pl.serverPlayer:
+            thread = ResultThread(target=self.runHostedGame, args=(game,))
+        else:
+            thread = ResultThread(target=game.run)
         thread.daemon = True
         self.timer = QTimer()
         self.timer.timeout.connect(
@@ -411,6 +451,18 @@ class GUI(UI):
         thread.start()
         self.timer.start(1000)
 
+    def runHostedGame(self, game: Game):
+        """
+        Waits for the client to join, then runs the game.
+        This runs on the game thread, so the GUI does not freeze while waiting.
+        Returns None without running the game if the client does not join.
+        """
+        try:
+            game.getPlayer2().waitForClient()
+        except OSError:
+            return None
+        return game.run()
+
     def gameOver(self, gameThread, timed: bool = False):
         """
         Checks if the game thread is still running.
@@ -420,6 +472,13 @@ class GUI(UI):
         if not gameThread.is_alive():
             self.timer.stop()
             self.mainWindow.show()
+            # the spectators are disconnected even if the game crashed
+            if type(self.player2) == pl.serverPlayer:
+                self.player2.stopBroadcasting()
+                if not self.player2.isConnected():
+                    self.player1.hide()
+                    self.showNoClientError(self.player2.port)
+                    return
             if not gameThread.value:
                 raise RuntimeError(
                     "Game thread returned None. Probably means the game crashed."
@@ -453,6 +512,28 @@ class GUI(UI):
                 self._mode.name,
             )
 
+    def showSpectatorError(self, port: int, error: OSError):
+        """
+        Tells the host that spectators cannot join the game
+        """
+        msgBox = qtw.QMessageBox()
+        msgBox.setWindowTitle("No Spectators")
+        msgBox.setText(
+            f"Spectators cannot join as port {port} could not be opened: {error.strerror}"
+        )
+        msgBox.setIcon(qtw.QMessageBox.Icon.Warning)
+        msgBox.exec()
+
+    def showNoClientError(self, port: int):
+        """
+        Tells the host that nobody joined the game
+        """
+        msgBox = qtw.QMessageBox()
+        msgBox.setWindowTitle("No Opponent")
+        msgBox.setText(f"Nobody joined the game on port {port}")
+        msgBox.setIcon(qtw.QMessageBox.Icon.Warning)
+        msgBox.exec()
+
     def timedModeOver(self, timeTaken, won):
         if won:
             msg = f"You took {timeTaken} seconds to win!"
@@ -719,6 +800,7 @@ class Terminal(UI):
                 player2 = pl.Computer(
                     self._dbm.createEmptyStatsTable("Computer"),
                     self._computerAlgorithmType,
+                    self.TIMED_MOVE_BUDGET,
                 )
                 game = Game(player1, player2, 4, 6, 1, True, 6)
                 timeTaken, p1Win = game.run()
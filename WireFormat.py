@@ -0,0 +1,229 @@
+import struct
+
+from Board import Board
+
+# the tags at the start of each value, saying what type of value follows
+NONE = b"N"
+INT = b"I"
+STR = b"S"
+INT_LIST = b"L"
+BOARD = b"B"
+
+# <tag><value>
+INT_FORMAT = struct.Struct("!q")
+# <no. of bytes>, followed by the utf-8 bytes
+STR_HEADER = struct.Struct("!I")
+# <no. of ints>, followed by each int
+LIST_HEADER = struct.Struct("!H")
+LIST_ITEM = struct.Struct("!i")
+# <length><total guesses><duplicates allowed><no. of colours><first turn><no. of turns>
+BOARD_HEADER = struct.Struct("!BH?BHH")
+# each turn is <encoded guess><encoded result>, see Feedback.py
+# the guess takes as many bytes as the largest code on the board needs, so it fits any number of pegs
+# <encoded result>
+BOARD_RESULT = struct.Struct("!H")
+
+
+def getGuessSize(lengthOfCode: int, colourNum: int) -> int:
+    """
+    Returns the number of bytes needed to hold any encoded code for the board configuration
+    """
+    return max(1, ((colourNum**lengthOfCode - 1).bit_length() + 7) // 8)
+
+
+class WireFormatError(Exception):
+    """
+    An exception for data that cannot be encoded or decoded.
+    """
+
+    pass
+
+
+class WireFormat:
+    """
+    Encodes the data sent in a message as bytes, and decodes it again at the other end.
+    Only None, ints, strings, lists of ints and boards can be sent,
+    so nothing sent by the other end can run code when it is decoded, unlike with pickle.
+
+    A board is sent as its configuration, followed by its guesses and results as packed integers.
+    Only the turns that have not already been sent to the other end are sent,
+    so the size of a board message stays the same no matter how many guesses have been made.
+    Each end keeps one WireFormat for the whole connection to remember which turns have been sent.
+    """
+
+    ##############################################
+    # GROUP A SKILL: COMPLEX CLIENT-SERVER MODEL #
+    ##############################################
+
+    # the version of the format, which is the first byte of every encoding
+    VERSION = 2
+
+    def __init__(self):
+        # the last board sent, and the number of its turns that have been sent
+        self.__sentBoard: Board | None = None
+        self.__sentTurns = 0
+        # the board built from the boards received, which is updated as turns arrive
+        self.__receivedBoard: Board | None = None
+
+    def encode(self, data: list) -> bytes:
+        """
+        Encodes a list of data as bytes, in the form of:
+        <version><tagged value><tagged value>...
+        """
+        encoded = bytearray([self.VERSION])
+        try:
+            for value in data:
+                encoded += self.__encodeValue(value)
+        except (struct.error, OverflowError) as e:
+            ######################
+            # EXCEPTION HANDLING #
+            ######################
+            raise WireFormatError(f"Value out of range: {e}")
+        return bytes(encoded)
+
+    def decode(self, encoded: bytes) -> list:
+        """
+        Decodes bytes made by encode back into a list of data.
+        """
+        if not encoded or encoded[0] != self.VERSION:
+            raise WireFormatError("Unsupported wire format version")
+        data = []
+        offset = 1
+        try:
+            while offset < len(encoded):
+                value, offset = self.__decodeValue(encoded, offset)
+                data.append(value)
+        except (struct.error, UnicodeDecodeError, IndexError) as e:
+            ######################
+            # EXCEPTION HANDLING #
+            ######################
+            raise WireFormatError(f"Malformed data: {e}")
+        return data
+
+    def __encodeValue(self, value) -> bytes:
+        """
+        Encodes a single value with the tag for its type
+        """
+        if value is None:
+            return NONE
+        # bool is a subclass of int, so it is not allowed here to avoid it coming back as an int
+        elif isinstance(value, int) and not isinstance(value, bool):
+            return INT + INT_FORMAT.pack(value)
+        elif isinstance(value, str):
+            encodedStr = value.encode()
+            return STR + STR_HEADER.pack(len(encodedStr)) + encodedStr
+        elif isinstance(value, list) and all(
+            isinstance(i, int) and not isinstance(i, bool) for i in value
+        ):
+            return (
+                INT_LIST
+                + LIST_HEADER.pack(len(value))
+                + b"".join(LIST_ITEM.pack(i) for i in value)
+            )
+        elif isinstance(value, Board):
+            return BOARD + self.__encodeBoard(value)
+        raise WireFormatError(f"Cannot encode {type(value).__name__}")
+
+    def __decodeValue(self, encoded: bytes, offset: int) -> tuple:
+        """
+        Decodes the value starting at offset.
+        Returns a tuple of the value and the offset of the next value.
+        """
+        tag = encoded[offset : offset + 1]
+        offset += 1
+        if tag == NONE:
+            return None, offset
+        elif tag == INT:
+            (value,) = INT_FORMAT.unpack_from(encoded, offset)
+            return value, offset + INT_FORMAT.size
+        elif tag == STR:
+            (size,) = STR_HEADER.unpack_from(encoded, offset)
+            offset += STR_HEADER.size
+            if offset + size > len(encoded):
+                raise WireFormatError("String is longer than the data")
+            return encoded[offset : offset + size].decode(), offset + size
+        elif tag == INT_LIST:
+            (size,) = LIST_HEADER.unpack_from(encoded, offset)
+            offset += LIST_HEADER.size
+            value = [
+                i
+                for (i,) in LIST_ITEM.iter_unpack(
+                    encoded[offset : offset + size * LIST_ITEM.size]
+                )
+            ]
+            if len(value) != size:
+                raise WireFormatError("List is longer than the data")
+            return value, offset + size * LIST_ITEM.size
+        elif tag == BOARD:
+            return self.__decodeBoard(encoded, offset)
+        raise WireFormatError(f"Unknown tag: {tag}")
+
+    def __encodeBoard(self, board: Board) -> bytes:
+        """
+        Encodes the configuration of the board and the turns that have not been sent yet.
+        If it is a different board to the last one sent, every turn is sent.
+        """
+        if board is not self.__sentBoard:
+            self.__sentBoard = board
+            self.__sentTurns = 0
+        guesses = board.getEncodedGuesses()
+        results = board.getEncodedResults()
+        guessSize = getGuessSize(board.getLenOfGuess(), len(board.getColours()))
+        firstTurn = self.__sentTurns
+        encoded = bytearray(
+            BOARD_HEADER.pack(
+                board.getLenOfGuess(),
+                board.getTotalGuesses(),
+                board.getDuplicatesAllowed(),
+                len(board.getColours()),
+                firstTurn,
+                len(guesses) - firstTurn,
+            )
+        )
+        for i in range(firstTurn, len(guesses)):
+            encoded += guesses[i].to_bytes(guessSize, "big")
+            encoded += BOARD_RESULT.pack(results[i])
+        self.__sentTurns = len(guesses)
+        return bytes(encoded)
+
+    def __decodeBoard(self, encoded: bytes, offset: int) -> tuple[Board, int]:
+        """
+        Decodes a board, adding the turns to the last board received if they follow on from it.
+        Returns a tuple of the board and the offset of the next value.
+        """
+        length, totalGuesses, duplicatesAllowed, colourNum, firstTurn, numTurns = (
+            BOARD_HEADER.unpack_from(encoded, offset)
+        )
+        offset += BOARD_HEADER.size
+        if length == 0 or colourNum == 0:
+            raise WireFormatError("Board has no pegs or no colours")
+        board = self.__receivedBoard
+        if firstTurn == 0:
+            board = Board(length, totalGuesses, duplicatesAllowed, colourNum)
+        elif (
+            board is None
+            or len(board.getEncodedGuesses()) != firstTurn
+            or board.getLenOfGuess() != length
+            or board.getTotalGuesses() != totalGuesses
+            or len(board.getColours()) != colourNum
+        ):
+            raise WireFormatError(f"Turns from {firstTurn} do not follow on")
+        if len(board.getEncodedGuesses()) + numTurns > totalGuesses:
+            raise WireFormatError("More turns than the board has guesses")
+        guessSize = getGuessSize(length, colourNum)
+        if offset + numTurns * (guessSize + BOARD_RESULT.size) > len(encoded):
+            raise WireFormatError("Board is longer than the data")
+        for _ in range(numTurns):
+            guess = int.from_bytes(encoded[offset : offset + guessSize], "big")
+            offset += guessSize
+            (result,) = BOARD_RESULT.unpack_from(encoded, offset)
+            offset += BOARD_RESULT.size
+            # the encoded result is <no. of 1s> * (length + 1) + <no. of 2s>, see Feedback.py
+            black, white = divmod(result, length + 1)
+            if guess >= colourNum**length:
+                raise WireFormatError(f"Guess {guess} is not a valid code")
+            if black + white > length:
+                raise WireFormatError(f"Result {result} is not a valid response")
+            board.addEncodedGuess(guess, result)
+        self.__receivedBoard = board
+        return board, offset